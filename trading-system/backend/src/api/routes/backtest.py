@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from src.backtesting.backtesting_engine_mode import BacktestingEngine
 from src.backtesting import backtest_results
+from src.backtesting.backtest_results import split_fields
 import traceback
 
 router = APIRouter()
@@ -30,12 +31,23 @@ def run_backtest(req: BacktestRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/backtest/list")
-def list_backtests(model_id: Optional[str] = Query(None), limit: int = Query(20)):
-    return backtest_results.list_backtest_results(limit=limit, model_id=model_id)
+def list_backtests(
+    model_id: Optional[str] = Query(None),
+    limit: int = Query(20),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+):
+    return backtest_results.list_backtest_results(limit=limit, model_id=model_id, start=start, end=end, fields=split_fields(fields))
 
 @router.get("/backtest/{run_id}")
-def get_backtest(run_id: str):
-    result = backtest_results.load_backtest_result(run_id)
+def get_backtest(
+    run_id: str,
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+):
+    result = backtest_results.load_backtest_result(run_id, start=start, end=end, fields=split_fields(fields))
     if result is None:
         raise HTTPException(status_code=404, detail="Run not found")
     return result
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional
-from src.backtesting.backtest_results import load_backtest_result, list_backtest_results
+from src.backtesting.backtest_results import load_backtest_result, list_backtest_results, split_fields
 
 router = APIRouter()
 
 @router.get("/backtest/{run_id}")
-def get_backtest_result(run_id: str):
-    res = load_backtest_result(run_id)
+def get_backtest_result(run_id: str, start: Optional[str] = None, end: Optional[str] = None, fields: Optional[str] = None):
+    # fields: comma-separated subset of params,metrics,equity_curve,trades
+    res = load_backtest_result(run_id, start=start, end=end, fields=split_fields(fields))
     if res is None:
         raise HTTPException(status_code=404, detail="Backtest result not found")
     return res
 
 @router.get("/backtest/list")
-def list_backtests(limit: int = 20, model_id: Optional[str] = None):
-    return list_backtest_results(limit=limit, model_id=model_id)
+def list_backtests(limit: int = 20, model_id: Optional[str] = None, start: Optional[str] = None,
+                   end: Optional[str] = None, fields: Optional[str] = None):
+    return list_backtest_results(limit=limit, model_id=model_id, start=start, end=end, fields=split_fields(fields))
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from src.utils.duckdb_helpers import read_table, write_table
-from src.validation.validate_data import run_full_validation, basic_cleaning
+from src.utils.duckdb_helpers import read_table
+from src.utils.bar_storage import write_bars
+from src.validation.validate_data import validate_bars, basic_cleaning
 
 router = APIRouter()
 
@@ -25,9 +26,9 @@ def clean_data():
         df = read_table("raw")
         if df is None or df.empty:
             raise HTTPException(status_code=400, detail="No raw data found.")
-        results = run_full_validation(df, [], [])
+        results = validate_bars("raw")
         cleaned = basic_cleaning(df)
-        write_table(cleaned, "cleaned")
+        write_bars("cleaned", cleaned)
         payload = {
             "success": True,
             "validation": jsonify(results),
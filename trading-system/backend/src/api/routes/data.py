@@ -1,5 +1,7 @@
 from fastapi import APIRouter
-from src.utils.duckdb_helpers import read_table
+from src.utils.duckdb_helpers import run_query
+from src.utils.bar_storage import BAR_TABLES, bars_table, ensure_bars_table
+from src.utils.coverage import read_coverage
 from typing import Any, Dict
 
 router = APIRouter()
@@ -7,29 +9,20 @@ router = APIRouter()
 def get_ticker_info(table: str) -> Dict[str, Dict]:
     res = {}
     try:
-        df = read_table(table)
-        if df is not None and not df.empty:
-            if table == "features_tidy":
-                ticker_col, date_col = "Ticker", "Date"
-            else:
-                # infer tickers from wide format
-                cols = [c for c in df.columns if "_" in c and c.endswith("Close")]
-                tickers = sorted(set(c.split("_")[0] for c in cols))
-                ticker_col, date_col = None, "Date"
-            tickers = (
-                sorted(set(df[ticker_col])) if ticker_col else tickers
-            )
-            for ticker in tickers:
-                if ticker_col:
-                    dft = df[df[ticker_col] == ticker]
-                else:
-                    dft = df[[date_col, f"{ticker}_Close"]].dropna(subset=[f"{ticker}_Close"])
-                if not dft.empty:
-                    res[ticker] = {
-                        "start_date": str(dft[date_col].min()),
-                        "end_date": str(dft[date_col].max()),
-                        "row_count": len(dft),
-                    }
+        if table in BAR_TABLES:
+            # Maintained on every bar write; counts dates with a Close
+            ensure_bars_table(table)
+            return read_coverage(bars_table(table))
+        df = run_query(
+            f"SELECT Ticker, min(Date) AS start_date, max(Date) AS end_date, count(*) AS row_count "
+            f"FROM {table} GROUP BY Ticker ORDER BY Ticker"
+        )
+        for row in df.itertuples(index=False):
+            res[str(row.Ticker)] = {
+                "start_date": str(row.start_date),
+                "end_date": str(row.end_date),
+                "row_count": int(row.row_count),
+            }
     except Exception:
         pass
     return res
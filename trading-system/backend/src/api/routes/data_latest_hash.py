@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Query
 from typing import List, Optional
-import duckdb
-import pandas as pd
-from src.utils.data_hash import hash_dataframe, hash_series
-from src.utils.duckdb_helpers import get_con
+from src.models.feature_matrix import KEY_COLUMNS
+from src.utils.duckdb_helpers import table_columns
+from src.utils.partition_digests import dataset_hash
 
 router = APIRouter()
 
@@ -12,19 +11,15 @@ def latest_data_hash(
     tickers: Optional[List[str]] = Query(None),
     target: str = "Return_1d"
 ):
-    with get_con() as con:
-        df = con.execute("SELECT * FROM features_tidy").df()
-    if tickers:
-        df = df[df["Ticker"].isin(tickers)]
-    if target in df.columns:
-        df = df.dropna(subset=[target])
-    cols = [c for c in df.columns if c not in ("Date", "Ticker", target)]
-    features_hash = hash_dataframe(df[cols])
-    target_hash = hash_series(df[target]) if target in df.columns else None
-    last_date = str(df["Date"].max()) if "Date" in df.columns else None
+    columns = table_columns("features_tidy")
+    if target not in columns:
+        return {"features_hash": None, "target_hash": None, "last_date": None, "row_count": 0}
+    # From the stored partition digests, the same hashes ModelTrainer records
+    features = dataset_hash("features_tidy", tickers, [c for c in columns if c not in KEY_COLUMNS and c != target])
+    target_digest = dataset_hash("features_tidy", tickers, [target])
     return {
-        "features_hash": features_hash,
-        "target_hash": target_hash,
-        "last_date": last_date,
-        "row_count": len(df)
+        "features_hash": features["hash"],
+        "target_hash": target_digest["hash"],
+        "last_date": target_digest["last_date"],
+        "row_count": target_digest["row_count"]
     }
@@ -1,16 +1,16 @@
-from fastapi import APIRouter
-from typing import List, Dict, Any
-import duckdb
+from fastapi import APIRouter, Query
+from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
-from src.utils.duckdb_helpers import get_con
+from src.utils.duckdb_helpers import read_frame
+from src.utils.bar_storage import bars_table, ensure_bars_table
+from src.utils.coverage import read_coverage
 
 router = APIRouter()
 
 @router.get("/data/quality")
-def get_data_quality():
-    with get_con() as con:
-        df = con.execute("SELECT * FROM cleaned").df()
+def get_data_quality(tickers: Optional[List[str]] = Query(None)):
+    df = read_frame("cleaned", tickers=tickers)
 
     # Identify tickers & features
     cols = list(df.columns)
@@ -37,15 +37,11 @@ def get_data_quality():
             "outlier_count": int(outliers)
         }
 
-    # Find staleness for each ticker (latest overall date in cleaned data)
-    last_date = df["Date"].max() if "Date" in df else None
-    ticker_last_date = {
-        ticker: max(
-            (info[f]["last_valid_date"] for f in info if info[f]["last_valid_date"]),
-            default=None
-        )
-        for ticker, info in ticker_info.items()
-    }
+    # Staleness and gaps from the coverage catalog (latest overall date in cleaned data)
+    ensure_bars_table("cleaned")
+    coverage = read_coverage(bars_table("cleaned"), tickers)
+    last_date = max((c["end_date"] for c in coverage.values()), default=None)
+    ticker_last_date = {ticker: coverage.get(ticker, {}).get("end_date") for ticker in sorted(set(ticker_info) | set(coverage))}
 
     # Warning evaluation
     alerts = []
@@ -53,6 +49,10 @@ def get_data_quality():
         if last is None or (last_date and last < str(last_date)):
             alerts.append(f"Data for {ticker} is stale. Last value: {last}. Cleaned table last: {last_date}")
 
+    for ticker, info in coverage.items():
+        for gap_start, gap_end in info["gaps"]:
+            alerts.append(f"Gap in {ticker} data: no bars from {gap_start} to {gap_end}")
+
     # Any high missingness?
     for ticker, info in ticker_info.items():
         for feat, vals in info.items():
@@ -1,19 +1,44 @@
 from fastapi import APIRouter, HTTPException
-from src.features.feature_engineering import compute_all_ticker_features
-from src.features.tidy_feature_engineering import wide_to_tidy_features
+from typing import Optional
+from src.features.feature_engineering import compute_feature_block, FEATURE_GROUPS
+from src.features.cross_sectional import add_cross_sectional_features
+from src.features.incremental_features import run_incremental_features, save_feature_state
+from src.features.streaming_features import stream_features, CHUNK_ROWS
+from src.features.tidy_feature_engineering import create_wide_features_view
 from src.utils.duckdb_helpers import read_table, write_table
 router = APIRouter()
 
 @router.post("/data/features")
-def generate_features():
+def generate_features(
+    incremental: bool = False,
+    workers: Optional[int] = None,
+    use_cache: bool = False,
+    stream: bool = False,
+    chunk_rows: int = CHUNK_ROWS,
+    materialize_wide: bool = False,
+):
     try:
+        if stream:
+            # Bounded memory: never loads the full cleaned table
+            return stream_features(FEATURE_GROUPS, chunk_rows=chunk_rows, write_wide=materialize_wide)
         df = read_table("cleaned")
-        feats = compute_all_ticker_features(df)
-        write_table(feats, "features")
-        
-        # Also save tidy features
-        tidy = wide_to_tidy_features(feats)
+        if incremental:
+            result = run_incremental_features(df)
+            if result is not None:
+                return result
+        block = compute_feature_block(df, workers=workers, use_cache=use_cache)
+        if block is None:
+            return {"success": False, "error": "No ticker columns in 'cleaned'"}
+        # Tidy rows come out of the engine already in (Date, Ticker) order
+        tidy = block.to_tidy()
+        if FEATURE_GROUPS["cross_sectional"]:
+            tidy = add_cross_sectional_features(tidy)
         write_table(tidy, "features_tidy")
-        return {"success": True, "row_count": len(tidy)}
+        if materialize_wide:
+            write_table(block.to_wide(), "features")
+        else:
+            create_wide_features_view(block.names, block.panel.tickers)
+        save_feature_state(tidy)
+        return {"success": True, "mode": "full", "row_count": len(tidy)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
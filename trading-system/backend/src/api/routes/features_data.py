@@ -1,19 +1,28 @@
 from fastapi import APIRouter, HTTPException, Query
-from src.utils.duckdb_helpers import read_table
-from typing import Any
+from src.features.cross_sectional import CROSS_SECTIONAL_SUFFIXES
+from src.utils.duckdb_helpers import read_frame, table_columns
+from typing import Any, Optional
 
 router = APIRouter()
 
 @router.get("/data/features")
-def get_features_for_ticker(ticker: str = Query(...)) -> Any:
-    df = read_table("features")
-    if df is None or df.empty:
+def get_features_for_ticker(
+    ticker: str = Query(...),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+) -> Any:
+    # Read one ticker's rows from features_tidy instead of the (possibly pivoted) wide table
+    columns = [
+        c for c in table_columns("features_tidy")
+        if c != "Ticker" and not c.endswith(CROSS_SECTIONAL_SUFFIXES)
+    ]
+    df = read_frame(
+        "features_tidy", columns=columns, tickers=[ticker],
+        start=start, end=end, limit=limit, offset=offset, dropna=True,
+    )
+    if df.empty:
         return []
-    # Always include 'Date' if present
-    cols = [c for c in df.columns if c.startswith(f"{ticker}_")]
-    if "Date" in df.columns:
-        cols = ["Date"] + cols
-    if not cols or all(col not in df.columns for col in cols):
-        return []
-    result = df[cols].dropna().to_dict(orient="records")
-    return result
+    df.columns = ["Date"] + [f"{ticker}_{c}" for c in df.columns[1:]]
+    return df.to_dict(orient="records")
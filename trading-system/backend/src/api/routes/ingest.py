@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
-from src.ingestion.yahoo_ingest import ingest_yahoo
+from src.ingestion.yahoo_ingest import ingest_files, ingest_yahoo
+from src.ingestion.scheduler import BATCH_SIZE, MAX_WORKERS
+from src.ingestion.data_sources import IMPORT_DIR, READ_WORKERS, get_source
 
 router = APIRouter()
 
@@ -10,15 +12,36 @@ class IngestRequest(BaseModel):
     start: str
     end: str
     interval: Optional[str] = "1d"
+    batch_size: int = BATCH_SIZE
+    max_workers: int = MAX_WORKERS
+    # "yahoo" or "synthetic" (with an optional seed)
+    source: str = "yahoo"
+    seed: int = 0
+    # Re-request sessions previously recorded as unavailable
+    force: bool = False
+
+class FileIngestRequest(BaseModel):
+    # File, directory or glob relative to the import directory
+    path: str
+    tickers: Optional[List[str]] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    workers: int = READ_WORKERS
 
 @router.post("/ingest")
 def ingest(request: IngestRequest):
+    if request.source not in ("yahoo", "synthetic"):
+        raise HTTPException(status_code=400, detail=f"Unsupported source '{request.source}'; load local files through /ingest/files")
     try:
         result = ingest_yahoo(
             tickers=request.tickers,
             start=request.start,
             end=request.end,
             interval=request.interval,
+            batch_size=request.batch_size,
+            max_workers=request.max_workers,
+            source=get_source(request.source, **({"seed": request.seed} if request.source == "synthetic" else {})),
+            force=request.force,
         )
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Unknown error"))
@@ -27,3 +50,19 @@ def ingest(request: IngestRequest):
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest/files")
+def ingest_from_files(request: FileIngestRequest):
+    try:
+        result = ingest_files(request.path, request.tickers, request.start, request.end, request.workers, root=IMPORT_DIR)
+        if not result.get("success"):
+            raise HTTPException(status_code=400, detail=result.get("failed"))
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
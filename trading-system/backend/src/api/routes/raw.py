@@ -1,19 +1,21 @@
 from fastapi import APIRouter, HTTPException, Query
-from src.utils.duckdb_helpers import read_table
-from typing import Any
+from src.utils.bar_storage import read_bars
+from typing import Any, Optional
 
 router = APIRouter()
 
 @router.get("/data/raw")
-def get_raw_for_ticker(ticker: str = Query(...)) -> Any:
-    df = read_table("raw")
-    if df is None or df.empty:
+def get_raw_for_ticker(
+    ticker: str = Query(...),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+) -> Any:
+    # One ticker's rows from the long table; NULL rows are dropped in SQL
+    df = read_bars("raw", tickers=[ticker], start=start, end=end, limit=limit, offset=offset, dropna=True)
+    if df.empty:
         return []
-    # Always include 'Date' column if present
-    cols = [c for c in df.columns if c.startswith(f"{ticker}_")]
-    if "Date" in df.columns:
-        cols = ["Date"] + cols
-    if not cols or all(col not in df.columns for col in cols):
-        return []
-    result = df[cols].dropna().to_dict(orient="records")
-    return result
+    df = df.drop(columns=["Ticker"])
+    df.columns = ["Date"] + [f"{ticker}_{c}" for c in df.columns[1:]]
+    return df.to_dict(orient="records")
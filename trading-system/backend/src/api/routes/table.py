@@ -1,21 +1,24 @@
 from fastapi import APIRouter, HTTPException, Query
-from src.utils.duckdb_helpers import read_table
+from typing import Optional
+from src.api.routes.features_data import get_features_for_ticker
+from src.utils.bar_storage import read_bars
 
 router = APIRouter()
 
 @router.get("/data/table")
 def get_table_data(
     table: str = Query(..., regex="^(raw|cleaned|features)$"),
-    ticker: str = Query(...)
+    ticker: str = Query(...),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
 ):
-    df = read_table(table)
-    if df is None or df.empty:
+    if table == "features":
+        return get_features_for_ticker(ticker, start, end, limit, offset)
+    df = read_bars(table, tickers=[ticker], start=start, end=end, limit=limit, offset=offset, dropna=True)
+    if df.empty:
         return []
-    # Always include 'Date' column if present
-    cols = [c for c in df.columns if c.startswith(f"{ticker}_")]
-    if "Date" in df.columns:
-        cols = ["Date"] + cols
-    if not cols or all(col not in df.columns for col in cols):
-        return []
-    result = df[cols].dropna().to_dict(orient="records")
-    return result
+    df = df.drop(columns=["Ticker"])
+    df.columns = ["Date"] + [f"{ticker}_{c}" for c in df.columns[1:]]
+    return df.to_dict(orient="records")
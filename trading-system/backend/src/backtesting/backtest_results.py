@@ -1,77 +1,206 @@
 import os
-import duckdb
 import json
+import numpy as np
+import pandas as pd
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Union
+from src.utils import duckdb_helpers
+from src.utils.duckdb_helpers import get_con, read_frame, run_write
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/database.duckdb"))
+# equity_curve / trades JSON columns are only filled by runs saved before
+# backtest_equity / backtest_trades existed
+RESULTS_DDL = """
+CREATE TABLE IF NOT EXISTS backtest_results (
+    run_id VARCHAR PRIMARY KEY,
+    model_id VARCHAR,
+    params JSON,
+    start_date DATE,
+    end_date DATE,
+    created_at TIMESTAMP,
+    metrics JSON,
+    equity_curve JSON,
+    trades JSON
+);
+"""
+
+EQUITY_DDL = """
+CREATE TABLE IF NOT EXISTS backtest_equity (
+    run_id VARCHAR,
+    Date DATE,
+    equity DOUBLE
+);
+"""
+
+TRADES_DDL = """
+CREATE TABLE IF NOT EXISTS backtest_trades (
+    run_id VARCHAR,
+    Date DATE,
+    Ticker VARCHAR,
+    Change DOUBLE,
+    WeightAfter DOUBLE
+);
+"""
+
+TRADE_COLUMNS = ["Date", "Ticker", "Change", "WeightAfter"]
+RESULT_FIELDS = ["params", "metrics", "equity_curve", "trades"]
+LIST_FIELDS = ["run_id", "model_id", "created_at", "start_date", "end_date", "metrics", "params"]
+DEFAULT_LIST_FIELDS = ["run_id", "model_id", "created_at", "start_date", "end_date", "metrics"]
+JSON_FIELDS = {"params", "metrics"}
+DATE_FIELDS = ("start_date", "end_date")
+
+# Databases whose backtest tables were created by this process
+_ensured: Set[str] = set()
 
 def ensure_backtest_table():
-    ddl = """
-    CREATE TABLE IF NOT EXISTS backtest_results (
-        run_id VARCHAR PRIMARY KEY,
-        model_id VARCHAR,
-        params JSON,
-        start_date DATE,
-        end_date DATE,
-        created_at TIMESTAMP,
-        metrics JSON,
-        equity_curve JSON,
-        trades JSON
-    );
-    """
-    with duckdb.connect(DB_PATH) as con:
-        con.execute(ddl)
+    # Once per process and database: reads never wait on the writer queue
+    path = os.path.abspath(duckdb_helpers.DB_PATH)
+    if path in _ensured:
+        return
+
+    def ensure(con):
+        for ddl in (RESULTS_DDL, EQUITY_DDL, TRADES_DDL):
+            con.execute(ddl)
+    run_write(ensure)
+    _ensured.add(path)
+
+def equity_frame(run_id: str, equity_curve: Union[pd.Series, Dict]) -> pd.DataFrame:
+    curve = equity_curve if isinstance(equity_curve, pd.Series) else pd.Series(equity_curve, dtype=np.float64)
+    return pd.DataFrame({
+        "run_id": run_id,
+        "Date": pd.to_datetime(curve.index).to_numpy(),
+        "equity": curve.to_numpy(dtype=np.float64),
+    })
+
+def trades_frame(run_id: str, trades: Union[pd.DataFrame, List[Dict]]) -> pd.DataFrame:
+    trades = trades if isinstance(trades, pd.DataFrame) else pd.DataFrame(trades)
+    if trades.empty:
+        trades = pd.DataFrame({c: pd.Series(dtype=np.float64) for c in TRADE_COLUMNS})
+    return pd.DataFrame({
+        "run_id": run_id,
+        "Date": pd.to_datetime(trades["Date"]).to_numpy(),
+        "Ticker": trades["Ticker"].astype(str).to_numpy(),
+        "Change": trades["Change"].to_numpy(dtype=np.float64),
+        "WeightAfter": trades["WeightAfter"].to_numpy(dtype=np.float64),
+    })
 
 def save_backtest_result(run_id: str, model_id: str, params: Dict[str, Any], start_date: str, end_date: str,
-                         metrics: Dict[str, Any], equity_curve: Dict, trades: Dict):
+                         metrics: Dict[str, Any], equity_curve: Union[pd.Series, Dict], trades: Union[pd.DataFrame, List[Dict]]):
+    """
+    Store the run's metadata row plus its equity curve and trades as rows of
+    backtest_equity / backtest_trades, all in one transaction. Accepts the
+    engine's Series / DataFrame directly (or their to_dict() forms).
+    """
     ensure_backtest_table()
-    record = {
-        "run_id": run_id,
-        "model_id": model_id,
-        "params": json.dumps(params),
-        "start_date": start_date,
-        "end_date": end_date,
-        "created_at": datetime.now().isoformat(),
-        "metrics": json.dumps(metrics),
-        "equity_curve": json.dumps(equity_curve),
-        "trades": json.dumps(trades),
-    }
-    with duckdb.connect(DB_PATH) as con:
-        cols = ','.join(record.keys())
-        vals = ','.join(['?']*len(record))
-        sql = f"INSERT INTO backtest_results ({cols}) VALUES ({vals})"
-        con.execute(sql, list(record.values()))
-
-def load_backtest_result(run_id: str) -> Optional[Dict[str, Any]]:
+    record = [run_id, model_id, json.dumps(params), start_date, end_date, datetime.now().isoformat(), json.dumps(metrics)]
+    equity = equity_frame(run_id, equity_curve)
+    trade_rows = trades_frame(run_id, trades)
+
+    def save(con):
+        con.register("equity_rows", equity)
+        con.register("trade_rows", trade_rows)
+        try:
+            con.execute("BEGIN TRANSACTION")
+            con.execute(
+                "INSERT INTO backtest_results (run_id, model_id, params, start_date, end_date, created_at, metrics) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                record,
+            )
+            con.execute("INSERT INTO backtest_equity SELECT run_id, CAST(Date AS DATE), equity FROM equity_rows ORDER BY Date")
+            con.execute(
+                "INSERT INTO backtest_trades SELECT run_id, CAST(Date AS DATE), Ticker, Change, WeightAfter "
+                "FROM trade_rows ORDER BY Date, Ticker"
+            )
+            con.execute("COMMIT")
+        finally:
+            con.unregister("equity_rows")
+            con.unregister("trade_rows")
+    run_write(save)
+
+def split_fields(fields: Optional[str]) -> Optional[List[str]]:
+    # "metrics,equity_curve" query parameter -> field list
+    return [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+def date_strings(values: pd.Series) -> List[str]:
+    return pd.to_datetime(values).dt.strftime("%Y-%m-%d").tolist()
+
+def in_window(date: Any, start: Optional[str], end: Optional[str]) -> bool:
+    # Legacy JSON keys are ISO dates or timestamps
+    day = str(date)[:10]
+    return (start is None or day >= str(start)[:10]) and (end is None or day <= str(end)[:10])
+
+def load_backtest_result(
+    run_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load one run. `fields` picks among params / metrics / equity_curve /
+    trades (default all); `start` / `end` restrict the equity curve and
+    trades to a date window, filtered in DuckDB.
+    """
     ensure_backtest_table()
-    with duckdb.connect(DB_PATH) as con:
-        res = con.execute("SELECT * FROM backtest_results WHERE run_id = ?", [run_id]).fetchone()
+    fields = [f for f in (fields or RESULT_FIELDS) if f in RESULT_FIELDS]
+    columns = ["run_id", "model_id", "start_date", "end_date", "created_at"] + [f for f in fields if f in JSON_FIELDS]
+    with get_con() as con:
+        res = con.execute(
+            f"SELECT {', '.join(columns)}, equity_curve IS NOT NULL FROM backtest_results WHERE run_id = ?", [run_id]
+        ).fetchone()
         if res is None:
             return None
-        colnames = [desc[0] for desc in con.description]
-        record = dict(zip(colnames, res))
-        # Parse JSON fields
-        record["params"] = json.loads(record["params"])
-        record["metrics"] = json.loads(record["metrics"])
-        record["equity_curve"] = json.loads(record["equity_curve"])
-        record["trades"] = json.loads(record["trades"])
+        *values, legacy = res
+        record = dict(zip(columns, values))
+        for name in JSON_FIELDS & set(fields):
+            record[name] = json.loads(record[name]) if isinstance(record[name], str) else record[name]
+        if legacy and {"equity_curve", "trades"} & set(fields):
+            blobs = con.execute("SELECT equity_curve, trades FROM backtest_results WHERE run_id = ?", [run_id]).fetchone()
+    if legacy:
+        if "equity_curve" in fields:
+            record["equity_curve"] = {k: v for k, v in json.loads(blobs[0]).items() if in_window(k, start, end)}
+        if "trades" in fields:
+            record["trades"] = [t for t in json.loads(blobs[1]) if in_window(t.get("Date"), start, end)]
         return record
+    if "equity_curve" in fields:
+        equity = read_frame("backtest_equity", columns=["Date", "equity"], start=start, end=end, filters={"run_id": run_id})
+        record["equity_curve"] = dict(zip(date_strings(equity["Date"]), equity["equity"].tolist()))
+    if "trades" in fields:
+        trades = read_frame("backtest_trades", columns=TRADE_COLUMNS, start=start, end=end, filters={"run_id": run_id})
+        trades["Date"] = date_strings(trades["Date"])
+        record["trades"] = trades.to_dict(orient="records")
+    return record
 
-def list_backtest_results(limit: int = 20, model_id: Optional[str] = None) -> list:
+def list_backtest_results(
+    limit: int = 20,
+    model_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> list:
+    # `start` / `end` keep runs whose test window overlaps the given one
     ensure_backtest_table()
-    with duckdb.connect(DB_PATH) as con:
-        if model_id:
-            results = con.execute(
-                "SELECT run_id, model_id, created_at, start_date, end_date, metrics FROM backtest_results WHERE model_id = ? ORDER BY created_at DESC LIMIT ?",
-                [model_id, limit]
-            ).fetchdf()
-        else:
-            results = con.execute(
-                "SELECT run_id, model_id, created_at, start_date, end_date, metrics FROM backtest_results ORDER BY created_at DESC LIMIT ?",
-                [limit]
-            ).fetchdf()
+    columns = [f for f in (fields or DEFAULT_LIST_FIELDS) if f in LIST_FIELDS]
+    if "run_id" not in columns:
+        columns.insert(0, "run_id")
+    where, params = [], []
+    if model_id:
+        where.append("model_id = ?")
+        params.append(model_id)
+    if start:
+        where.append("(end_date IS NULL OR end_date >= ?)")
+        params.append(start)
+    if end:
+        where.append("(start_date IS NULL OR start_date <= ?)")
+        params.append(end)
+    query = f"SELECT {', '.join(columns)} FROM backtest_results"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY created_at DESC LIMIT ?"
+    with get_con() as con:
+        results = con.execute(query, params + [limit]).fetchdf()
     if results.empty:
         return []
-    results["metrics"] = results["metrics"].apply(lambda m: json.loads(m) if isinstance(m, str) else (m or {}))
+    for name in JSON_FIELDS & set(columns):
+        results[name] = results[name].apply(lambda m: json.loads(m) if isinstance(m, str) else (m or {}))
+    for name in set(DATE_FIELDS) & set(columns):
+        results[name] = results[name].astype(object).where(results[name].notna(), None)
     return results.to_dict(orient="records")
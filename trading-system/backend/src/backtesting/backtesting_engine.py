@@ -5,7 +5,7 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional, Callable, Any
 from datetime import datetime
-from src.utils.duckdb_helpers import ensure_predictions_table, get_con
+from src.utils.prediction_store import read_predictions
 
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/database.duckdb"))
 
@@ -39,10 +39,16 @@ class BacktestingEngine:
         self.initial_capital = initial_capital
         self.position_sizer = position_sizer or self.default_position_sizer
 
-    def load_predictions(self, model_id: str) -> pd.DataFrame:
-        ensure_predictions_table()
-        with get_con() as con:
-            preds = con.execute("SELECT * FROM predictions WHERE model_id = ?", [model_id]).df()
+    def load_predictions(
+        self,
+        model_id: str,
+        tickers: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        preds = read_predictions(model_id, tickers=tickers, start=start_date, end=end_date)
+        # Stored as DATE; results and their JSON keep the ISO date strings
+        preds["Date"] = pd.to_datetime(preds["Date"]).dt.strftime("%Y-%m-%d")
         return preds
 
     def run(
@@ -56,14 +62,7 @@ class BacktestingEngine:
         slippage_bps: Optional[float] = None,
         params: Optional[Dict[str, Any]] = None,
     ) -> 'BacktestResult':
-        preds = self.load_predictions(model_id)
-        if tickers:
-            preds = preds[preds["Ticker"].isin(tickers)]
-        if start_date:
-            preds = preds[preds["Date"] >= start_date]
-        if end_date:
-            preds = preds[preds["Date"] <= end_date]
-        preds = preds.sort_values(["Date", "Ticker"])
+        preds = self.load_predictions(model_id, tickers, start_date, end_date)
 
         if preds.empty:
             raise ValueError(f"No prediction data found for model_id='{model_id}'. Cannot run backtest.")
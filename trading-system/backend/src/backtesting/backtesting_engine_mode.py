@@ -34,8 +34,8 @@ class BacktestingEngine(BaseBacktestingEngine):
             start_date=start_date,
             end_date=end_date,
             metrics=result.metrics,
-            equity_curve=result.equity_curve.to_dict(),
-            trades=result.trades.to_dict(orient="records"),
+            equity_curve=result.equity_curve,
+            trades=result.trades,
         )
         result.params["run_id"] = run_id
         return result
@@ -32,11 +32,7 @@ def walk_forward_backtest(
     stride = stride or window_test
     engine = BacktestingEngine(transaction_cost_bps=transaction_cost_bps, slippage_bps=slippage_bps)
     # Load all preds for model/tickers/date range
-    preds = engine.load_predictions(model_id)
-    if tickers:
-        preds = preds[preds["Ticker"].isin(tickers)]
-    preds = preds[(preds["Date"] >= full_start) & (preds["Date"] <= full_end)]
-    preds = preds.sort_values(["Date", "Ticker"])
+    preds = engine.load_predictions(model_id, tickers, full_start, full_end)
     unique_dates = pd.Series(preds["Date"].unique()).sort_values()
     runs = []
     i = 0
@@ -72,8 +68,8 @@ def walk_forward_backtest(
             start_date=str(test_start),
             end_date=str(test_end),
             metrics=result.metrics,
-            equity_curve=result.equity_curve.to_dict(),
-            trades=result.trades.to_dict(orient="records"),
+            equity_curve=result.equity_curve,
+            trades=result.trades,
         )
         runs.append({
             "run_id": run_id,
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from src.utils.duckdb_helpers import read_table, write_table
+
+CROSS_SECTIONAL_SUFFIXES = ("_zscore", "_rank")
+
+def cross_sectional_columns(tidy: pd.DataFrame, date_colname: str = "Date") -> List[str]:
+    return [
+        c for c in tidy.select_dtypes(include=[np.number]).columns
+        if c != date_colname and not c.endswith(CROSS_SECTIONAL_SUFFIXES)
+    ]
+
+def cross_sectional_names(features: List[str], columns: Optional[List[str]] = None) -> List[str]:
+    # Every column add_cross_sectional_features can add, whether or not a chunk has data for it
+    taken = {c.lower() for c in (columns if columns is not None else features) if not c.endswith(CROSS_SECTIONAL_SUFFIXES)}
+    return [
+        name for feat in features for name in (f"{feat}_zscore", f"{feat}_rank")
+        if name.lower() not in taken
+    ]
+
+def group_zscore(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    g, x = groups[valid], values[valid]
+    counts = np.bincount(g, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(g, weights=x, minlength=n_groups) / counts
+        std = np.sqrt(np.bincount(g, weights=(x - mean[g]) ** 2, minlength=n_groups) / counts)
+        out = np.full(len(values), np.nan)
+        out[valid] = (x - mean[g]) / (std[g] + 1e-8)
+    return out
+
+def group_pct_rank(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    # Percentile rank within each group with average ties, like Series.rank(pct=True)
+    valid = np.flatnonzero(~np.isnan(values))
+    g, x = groups[valid], values[valid]
+    order = np.lexsort((x, g))
+    g_sorted, x_sorted = g[order], x[order]
+    counts = np.bincount(g, minlength=n_groups)
+    group_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    new_run = np.ones(len(order), dtype=bool)
+    new_run[1:] = (g_sorted[1:] != g_sorted[:-1]) | (x_sorted[1:] != x_sorted[:-1])
+    run_id = np.cumsum(new_run) - 1
+    # Tied values form runs in sorted order; runs never span two groups
+    run_start = np.flatnonzero(new_run)
+    run_end = np.append(run_start[1:], len(order)) - 1
+    avg_rank = (run_start + run_end) / 2.0 - group_start[g_sorted[run_start]] + 1.0
+    out = np.full(len(values), np.nan)
+    out[valid[order]] = avg_rank[run_id] / counts[g_sorted]
+    return out
+
+def add_cross_sectional_features(
+    tidy: pd.DataFrame,
+    date_colname: str = "Date",
+    features: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Per-date z-score and percentile rank of each feature across all tickers.
+    Expects long-format rows (one per Date/Ticker) covering the whole universe.
+    """
+    if date_colname not in tidy.columns or tidy.empty:
+        return tidy
+    features = features if features is not None else cross_sectional_columns(tidy, date_colname)
+    # DuckDB column names are case-insensitive (e.g. Volume_Zscore vs Volume_zscore)
+    taken = {c.lower() for c in tidy.columns if not c.endswith(CROSS_SECTIONAL_SUFFIXES)}
+    groups, uniques = pd.factorize(tidy[date_colname], sort=False)
+    n_groups = len(uniques)
+    new_cols = {}
+    for feat in features:
+        values = tidy[feat].to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.count_nonzero(~np.isnan(values)) < 2:
+            continue
+        if f"{feat}_zscore".lower() not in taken:
+            new_cols[f"{feat}_zscore"] = group_zscore(values, groups, n_groups)
+        if f"{feat}_rank".lower() not in taken:
+            new_cols[f"{feat}_rank"] = group_pct_rank(values, groups, n_groups)
+    if not new_cols:
+        return tidy
+    extra = pd.DataFrame(new_cols, index=tidy.index)
+    return pd.concat([tidy.drop(columns=[c for c in new_cols if c in tidy.columns]), extra], axis=1)
+
+if __name__ == "__main__":
+    tidy = read_table("features_tidy")
+    tidy = tidy.drop(columns=[c for c in tidy.columns if c.endswith(CROSS_SECTIONAL_SUFFIXES)])
+    write_table(add_cross_sectional_features(tidy), "features_tidy")
+    print("Cross-sectional features written to DuckDB 'features_tidy'")
@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.features.panel_engine import FeatureBlock, Panel
+from src.utils.data_hash import hash_dataframe
+from src.utils.duckdb_helpers import read_table
+from src.utils.pandas_helpers import flatten_columns, split_wide_column
+
+FEATURE_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/features/cache"))
+FEATURE_CACHE_MAX_BYTES = int(os.environ.get("POLARIS_FEATURE_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+# Tables whose contents feed into a feature group besides the cleaned prices
+REFERENCE_TABLES = {"fundamental": "fundamental_data", "macro": "macro_data"}
+
+def reference_digest(feature_groups: Dict[str, bool]) -> Dict[str, Optional[str]]:
+    digests = {}
+    for group, table in REFERENCE_TABLES.items():
+        if not feature_groups.get(group):
+            continue
+        try:
+            digests[table] = hash_dataframe(read_table(table))
+        except Exception:
+            digests[table] = None
+    return digests
+
+def config_digest(
+    feature_groups: Dict[str, bool],
+    version: int,
+    technical_names: Optional[List[str]] = None,
+    reference: Optional[Dict[str, Optional[str]]] = None,
+) -> str:
+    config = {
+        "groups": feature_groups,
+        "version": version,
+        "technical": technical_names,
+        "reference": reference if reference is not None else reference_digest(feature_groups),
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+def group_ticker_columns(df: pd.DataFrame) -> Dict[str, List[str]]:
+    ticker_cols = {}
+    for col in df.columns:
+        parsed = split_wide_column(col)
+        if parsed is not None:
+            ticker_cols.setdefault(parsed[0], []).append(col)
+    return ticker_cols
+
+def ticker_cache_key(df: pd.DataFrame, ticker: str, cols: List[str], config: str) -> str:
+    # The ticker is part of the key: fundamental / alternative groups depend on it
+    return hashlib.sha256(f"{ticker}:{hash_dataframe(df[['Date'] + cols])}:{config}".encode()).hexdigest()
+
+def cache_path(key: str) -> str:
+    return os.path.join(FEATURE_CACHE_DIR, f"{key}.npz")
+
+def load_block(key: str) -> Optional[Tuple[List[str], np.ndarray]]:
+    path = cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            names, values = list(data["names"]), data["values"]
+    except Exception:
+        return None
+    os.utime(path)  # mark as recently used for eviction
+    return names, values
+
+def store_block(key: str, names: List[str], values: np.ndarray) -> None:
+    os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+    tmp = cache_path(key) + ".tmp.npz"
+    np.savez(tmp, names=np.array(names), values=values)
+    os.replace(tmp, cache_path(key))
+
+def evict_cache(max_bytes: int = FEATURE_CACHE_MAX_BYTES) -> int:
+    if not os.path.isdir(FEATURE_CACHE_DIR):
+        return 0
+    entries = []
+    for name in os.listdir(FEATURE_CACHE_DIR):
+        path = os.path.join(FEATURE_CACHE_DIR, name)
+        st = os.stat(path)
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    # Least recently used first
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+def compute_with_cache(
+    df: pd.DataFrame,
+    compute_fn: Callable[[pd.DataFrame], Optional[FeatureBlock]],
+    feature_groups: Dict[str, bool],
+    version: int,
+    technical_names: Optional[List[str]] = None,
+    reference: Optional[Dict[str, Optional[str]]] = None,
+) -> Tuple[Optional[FeatureBlock], Dict[str, Any]]:
+    """
+    Reuse cached per-ticker feature blocks and run `compute_fn` only for
+    tickers whose cleaned input (or the feature configuration) changed.
+    `reference` is the run's reference_digest, computed once by the caller.
+    """
+    df = flatten_columns(df)
+    ticker_cols = group_ticker_columns(df)
+    if not ticker_cols:
+        return None, {"hits": 0, "misses": 0}
+    config = config_digest(feature_groups, version, technical_names, reference)
+    keys = {t: ticker_cache_key(df, t, cols, config) for t, cols in ticker_cols.items()}
+    cached = {}
+    for ticker, key in keys.items():
+        block = load_block(key)
+        if block is not None and len(block[1]) == len(df):
+            cached[ticker] = block
+    misses = sorted(t for t in ticker_cols if t not in cached)
+
+    def compute(tickers: List[str]) -> Optional[FeatureBlock]:
+        return compute_fn(df[["Date"] + [c for t in tickers for c in ticker_cols[t]]]) if tickers else None
+
+    computed = compute(misses)
+    names = computed.names if computed is not None else next(iter(cached.values()))[0]
+    if any(list(cached_names) != list(names) for cached_names, _ in cached.values()):
+        # Entries written for another feature set would misalign columns
+        print("[INFO] Feature cache entries have different feature names; recomputing all tickers")
+        cached = {}
+        misses = sorted(ticker_cols)
+        computed = compute(misses)
+        names = computed.names
+    if computed is not None:
+        computed_rows = {ticker: i for i, ticker in enumerate(computed.panel.tickers)}
+
+    panel = Panel(df["Date"].to_numpy(), sorted(ticker_cols), {})
+    n, k = panel.shape
+    out = np.empty((k, len(names), n))
+    for i, ticker in enumerate(panel.tickers):
+        if ticker in cached:
+            out[i] = cached[ticker][1].T
+        else:
+            out[i] = computed.values[computed_rows[ticker]]
+            store_block(keys[ticker], names, out[i].T)
+    if misses:
+        evict_cache()
+    stats = {"hits": len(cached), "misses": len(misses)}
+    return FeatureBlock(panel, names, out), stats
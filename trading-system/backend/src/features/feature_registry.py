@@ -0,0 +1,134 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from src.features.panel_ops import (
+    shift, pct_change, diff, rolling_mean, rolling_std, rolling_max, rolling_min, ewm_mean,
+)
+from src.utils.pandas_helpers import SOURCE_FIELDS
+
+class FeatureSpec:
+    """
+    One node of the feature DAG. `window` is the number of prior rows of its
+    inputs a value needs; `stateful` nodes are recursive and can resume from a seed.
+    """
+    def __init__(self, name: str, inputs: List[str], fn: Callable, window: int = 0, stateful: bool = False, public: bool = True):
+        self.name = name
+        self.inputs = inputs
+        self.fn = fn
+        self.window = window
+        self.stateful = stateful
+        self.public = public
+
+REGISTRY: Dict[str, FeatureSpec] = {}
+
+def register(name: str, inputs: List[str], fn: Callable, window: int = 0, stateful: bool = False, public: bool = True) -> None:
+    for dep in inputs:
+        if dep not in REGISTRY and dep not in SOURCE_FIELDS:
+            raise ValueError(f"Feature '{name}' depends on unknown input '{dep}'")
+    REGISTRY[name] = FeatureSpec(name, inputs, fn, window, stateful, public)
+
+# --- Shared intermediates (computed once, freed after their last consumer) ---
+register("Close_Delta", ["Close"], lambda c: diff(c), window=1, public=False)
+register("Close_STD_20", ["Close"], lambda c: rolling_std(c, 20), window=19, public=False)
+register("Avg_Gain_14", ["Close_Delta"], lambda d: rolling_mean(np.clip(d, 0, None), 14), window=13, public=False)
+register("Avg_Loss_14", ["Close_Delta"], lambda d: rolling_mean(-np.clip(d, None, 0), 14), window=13, public=False)
+register("Volume_SMA_20", ["Volume"], lambda v: rolling_mean(v, 20), window=19, public=False)
+register("Volume_STD_20", ["Volume"], lambda v: rolling_std(v, 20), window=19, public=False)
+
+# --- Technical features ---
+register("Return_1d", ["Close"], lambda c: pct_change(c, 1), window=1)
+register("Return_5d", ["Close"], lambda c: pct_change(c, 5), window=5)
+register("Return_21d", ["Close"], lambda c: pct_change(c, 21), window=21)
+register("SMA_5", ["Close"], lambda c: rolling_mean(c, 5), window=4)
+register("SMA_20", ["Close"], lambda c: rolling_mean(c, 20), window=19)
+register("EMA_12", ["Close"], lambda c, seed=None: ewm_mean(c, 12, seed), stateful=True)
+register("EMA_26", ["Close"], lambda c, seed=None: ewm_mean(c, 26, seed), stateful=True)
+register("Volatility_10", ["Return_1d"], lambda r: rolling_std(r, 10), window=9)
+register("Volatility_21", ["Return_1d"], lambda r: rolling_std(r, 21), window=20)
+register("Volatility_126", ["Return_1d"], lambda r: rolling_std(r, 126) * np.sqrt(252), window=125)
+register("Rolling_Max_20", ["High"], lambda h: rolling_max(h, 20), window=19)
+register("Rolling_Min_20", ["Low"], lambda lo: rolling_min(lo, 20), window=19)
+register("RSI_14", ["Avg_Gain_14", "Avg_Loss_14"], lambda g, lo: 100 - (100 / (1 + g / (lo + 1e-10))))
+register("BB_upper", ["SMA_20", "Close_STD_20"], lambda m, s: m + 2.0 * s)
+register("BB_lower", ["SMA_20", "Close_STD_20"], lambda m, s: m - 2.0 * s)
+register("BB_bandwidth", ["BB_upper", "BB_lower", "SMA_20"], lambda u, lo, m: (u - lo) / (m + 1e-10))
+register("Momentum_10", ["Close"], lambda c: c - shift(c, 10), window=10)
+register("MACD", ["EMA_12", "EMA_26"], lambda a, b: a - b)
+register("MACD_Signal", ["MACD"], lambda m, seed=None: ewm_mean(m, 9, seed), stateful=True)
+register("Volume_Change", ["Volume"], lambda v: pct_change(v, 1), window=1)
+register("Volume_Zscore", ["Volume", "Volume_SMA_20", "Volume_STD_20"], lambda v, m, s: (v - m) / (s + 1e-10))
+
+TECHNICAL_FEATURES = [name for name, spec in REGISTRY.items() if spec.public]
+
+def plan_features(requested: List[str]) -> List[str]:
+    """
+    Topologically ordered list of every registry node needed for `requested`.
+    """
+    order: List[str] = []
+    visiting = set()
+    def visit(name: str) -> None:
+        if name in SOURCE_FIELDS or name in order:
+            return
+        if name not in REGISTRY:
+            raise ValueError(f"Unknown feature '{name}'")
+        if name in visiting:
+            raise ValueError(f"Feature dependency cycle at '{name}'")
+        visiting.add(name)
+        for dep in REGISTRY[name].inputs:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+    for name in requested:
+        visit(name)
+    return order
+
+def last_consumers(order: List[str]) -> Dict[str, int]:
+    last = {}
+    for step, name in enumerate(order):
+        for dep in REGISTRY[name].inputs:
+            last[dep] = step
+    return last
+
+def required_lookback(requested: List[str]) -> int:
+    # Prior rows needed for the first output row to be exact; stateful nodes
+    # resume from their seed instead of being re-warmed.
+    lookback: Dict[str, int] = {}
+    for name in plan_features(requested):
+        spec = REGISTRY[name]
+        upstream = max((lookback.get(dep, 0) for dep in spec.inputs), default=0)
+        lookback[name] = 0 if spec.stateful else spec.window + upstream
+    return max((lookback[name] for name in requested), default=0)
+
+def compute_registered(
+    fields: Dict[str, np.ndarray],
+    requested: Optional[List[str]] = None,
+    seeds: Optional[Dict[str, np.ndarray]] = None,
+    seed_row: int = 0,
+    state_out: Optional[Dict[str, np.ndarray]] = None,
+) -> List[Tuple[str, np.ndarray]]:
+    """
+    Evaluate `requested` features over the DAG. Stateful nodes with a seed
+    resume at `seed_row` (earlier rows are warm-up only and come back NaN);
+    `state_out` receives the last row of every stateful node.
+    """
+    requested = requested if requested is not None else TECHNICAL_FEATURES
+    seeds = seeds or {}
+    order = plan_features(requested)
+    last = last_consumers(order)
+    keep = set(requested)
+    values: Dict[str, np.ndarray] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for step, name in enumerate(order):
+            spec = REGISTRY[name]
+            args = [fields[dep] if dep in SOURCE_FIELDS else values[dep] for dep in spec.inputs]
+            if spec.stateful and name in seeds:
+                out = np.full(args[0].shape, np.nan)
+                out[seed_row:] = spec.fn(*(a[seed_row:] for a in args), seed=seeds[name])
+                values[name] = out
+            else:
+                values[name] = spec.fn(*args)
+            if spec.stateful and state_out is not None and len(values[name]):
+                state_out[name] = values[name][-1].copy()
+            for dep in spec.inputs:
+                if last.get(dep) == step and dep not in keep and dep in values:
+                    del values[dep]
+    return [(name, values[name]) for name in requested]
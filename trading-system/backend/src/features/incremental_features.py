@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from src.features.feature_engineering import FEATURE_GROUPS
+from src.features.cross_sectional import add_cross_sectional_features
+from src.features.panel_engine import build_panel, compute_panel_feature_list, panel_to_tidy
+from src.features.feature_registry import REGISTRY, TECHNICAL_FEATURES, required_lookback
+from src.utils.pandas_helpers import flatten_columns, split_wide_column
+from src.utils.duckdb_helpers import read_table, write_table, append_table, run_query, is_view
+
+# Longest trailing window used by the technical indicators (126 for Volatility_126).
+# Recursive EWMs don't need a warm-up: they resume from `feature_state`.
+LOOKBACK_DAYS = required_lookback(TECHNICAL_FEATURES)
+
+# Last value per ticker of every recursive (stateful) registry feature
+EMA_STATE_COLUMNS = [name for name in TECHNICAL_FEATURES if REGISTRY[name].stateful]
+
+def load_feature_state() -> Optional[pd.DataFrame]:
+    try:
+        state = read_table("feature_state")
+    except Exception:
+        return None
+    return state if not state.empty else None
+
+def save_feature_state(tidy: pd.DataFrame, overwrite: bool = True) -> None:
+    if tidy.empty or any(col not in tidy.columns for col in EMA_STATE_COLUMNS):
+        return
+    state = tidy.dropna(subset=EMA_STATE_COLUMNS)[["Date", "Ticker"] + EMA_STATE_COLUMNS]
+    if not overwrite:
+        old = load_feature_state()
+        if old is not None:
+            state = pd.concat([old, state], ignore_index=True)
+    state = state.sort_values("Date").drop_duplicates(subset=["Ticker"], keep="last")
+    write_table(state.reset_index(drop=True), "feature_state")
+
+def get_table_columns(table: str) -> Optional[List[str]]:
+    try:
+        return list(run_query(f"SELECT * FROM {table} LIMIT 0").columns)
+    except Exception:
+        return None
+
+def compute_incremental_features(df: pd.DataFrame, state: pd.DataFrame) -> Optional[pd.DataFrame]:
+    df = flatten_columns(df)
+    ticker_cols = {}
+    for col in df.columns:
+        parsed = split_wide_column(col)
+        if parsed is not None:
+            ticker_cols.setdefault(parsed[0], []).append(col)
+    tickers = sorted(ticker_cols)
+    state_by_ticker = {row["Ticker"]: row for row in state.to_dict(orient="records")}
+    if any(ticker not in state_by_ticker for ticker in tickers):
+        # New tickers have no saved history to resume from
+        return None
+    last_dates = {pd.Timestamp(state_by_ticker[ticker]["Date"]) for ticker in tickers}
+    if len(last_dates) > 1:
+        # Appending from different dates would give those dates a partial
+        # cross-section; a full rebuild keeps them equal to a fresh build
+        return None
+    last_date = last_dates.pop()
+    is_new = (pd.to_datetime(df["Date"]) > last_date).to_numpy()
+    if not is_new.any():
+        return pd.DataFrame(columns=["Date", "Ticker"])
+    # Resume through the same registry engine as full and streaming builds,
+    # seeded from the saved EWM values
+    first_new = int(is_new.argmax())
+    start = max(0, first_new - LOOKBACK_DAYS)
+    panel = build_panel(df.iloc[start:].reset_index(drop=True))
+    seeds = {
+        name: np.array([state_by_ticker[t][name] for t in panel.tickers], dtype=np.float64)
+        for name in EMA_STATE_COLUMNS
+    }
+    features = compute_panel_feature_list(panel, FEATURE_GROUPS, None, seeds, first_new - start)
+    tidy = panel_to_tidy(panel, features, start_row=first_new - start)
+    # Every ticker resumes from the same date, so each new date holds the full cross-section
+    return add_cross_sectional_features(tidy) if FEATURE_GROUPS["cross_sectional"] else tidy
+
+def tidy_to_wide_rows(tidy: pd.DataFrame) -> pd.DataFrame:
+    parts = []
+    for ticker, sub in tidy.groupby("Ticker", sort=True):
+        parts.append(sub.drop(columns=["Ticker"]).set_index("Date").add_prefix(f"{ticker}_"))
+    return pd.concat(parts, axis=1).reset_index()
+
+def run_incremental_features(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    Append feature rows for dates newer than the saved per-ticker state.
+    Returns None when a full rebuild is required instead.
+    """
+    state = load_feature_state()
+    tidy_cols = get_table_columns("features_tidy")
+    if state is None or tidy_cols is None:
+        return None
+    new_tidy = compute_incremental_features(df, state)
+    if new_tidy is None:
+        return None
+    if new_tidy.empty:
+        return {"success": True, "mode": "incremental", "row_count": 0}
+    # Digests of the months the new rows fall in are updated with the append
+    append_table(new_tidy.reindex(columns=tidy_cols), "features_tidy")
+    wide_cols = get_table_columns("features")
+    # A PIVOT view over features_tidy picks the new rows up by itself
+    if wide_cols is not None and not is_view("features"):
+        wide = tidy_to_wide_rows(new_tidy)
+        # Cross-sectional columns only live in features_tidy
+        append_table(wide.reindex(columns=wide_cols), "features")
+    save_feature_state(new_tidy, overwrite=False)
+    return {
+        "success": True,
+        "mode": "incremental",
+        "row_count": int(len(new_tidy)),
+        "start_date": str(new_tidy["Date"].min()),
+        "end_date": str(new_tidy["Date"].max()),
+    }
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from src.utils.pandas_helpers import SOURCE_FIELDS, flatten_columns, split_wide_column
+from src.features.reference_data import FUNDAMENTAL_COLUMNS, ReferenceData
+from src.features.feature_registry import compute_registered
+
+PRICE_FIELDS = list(SOURCE_FIELDS)
+
+class Panel:
+    """
+    Market data held as one dates x tickers float64 array per OHLCV field.
+    """
+    def __init__(self, dates: np.ndarray, tickers: List[str], fields: Dict[str, np.ndarray]):
+        self.dates = dates
+        self.tickers = tickers
+        self.fields = fields
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.dates), len(self.tickers)
+
+def build_panel(df: pd.DataFrame) -> Panel:
+    df = flatten_columns(df)
+    parsed = {col: split_wide_column(col) for col in df.columns if col != "Date"}
+    tickers = sorted(set(p[0] for p in parsed.values() if p is not None))
+    ticker_pos = {t: i for i, t in enumerate(tickers)}
+    n = len(df)
+    fields = {}
+    for col, p in parsed.items():
+        if p is None:
+            continue
+        ticker, field = p
+        if field not in fields:
+            fields[field] = np.full((n, len(tickers)), np.nan)
+        fields[field][:, ticker_pos[ticker]] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+    dates = df["Date"].to_numpy() if "Date" in df.columns else np.arange(n)
+    return Panel(dates, tickers, fields)
+
+# --- Feature groups ---
+
+def technical_features(
+    panel: Panel,
+    names: Optional[List[str]] = None,
+    seeds: Optional[Dict[str, np.ndarray]] = None,
+    seed_row: int = 0,
+    state_out: Optional[Dict[str, np.ndarray]] = None,
+) -> List[Tuple[str, np.ndarray]]:
+    # Planned over the registry DAG so shared intermediates are computed once
+    return compute_registered(panel.fields, names, seeds, seed_row, state_out)
+
+def fundamental_features(panel: Panel, reference: Optional[ReferenceData] = None) -> List[Tuple[str, np.ndarray]]:
+    n, k = panel.shape
+    reference = reference or ReferenceData(panel.dates, panel.tickers)
+    arrays = reference.fundamental_arrays()
+    if arrays is not None:
+        return list(arrays.items())
+    out = {col: np.empty((n, k)) for col in FUNDAMENTAL_COLUMNS}
+    for j, ticker in enumerate(panel.tickers):
+        np.random.seed(hash(ticker) % 1_000_000)
+        for col in FUNDAMENTAL_COLUMNS:
+            out[col][:, j] = np.random.uniform(5, 30, n)
+    return list(out.items())
+
+def macro_features(panel: Panel, reference: Optional[ReferenceData] = None) -> List[Tuple[str, np.ndarray]]:
+    n, k = panel.shape
+    reference = reference or ReferenceData(panel.dates, panel.tickers)
+    macro = reference.macro_frame()
+    if macro is not None:
+        series = [(col, macro[col].to_numpy(dtype=np.float64)) for col in macro.columns]
+    else:
+        np.random.seed(42)
+        series = [
+            ("FFR", np.random.uniform(0, 5, n)),
+            ("CPI", np.random.uniform(100, 300, n)),
+            ("YieldCurve", np.random.uniform(-1, 2, n)),
+        ]
+    # Macro series are shared by every ticker
+    return [(col, np.broadcast_to(vals[:, None], (n, k))) for col, vals in series]
+
+def alternative_features(panel: Panel) -> List[Tuple[str, np.ndarray]]:
+    n, k = panel.shape
+    sentiment = np.empty((n, k))
+    for j, ticker in enumerate(panel.tickers):
+        np.random.seed(hash(ticker) % 1_000_003)
+        sentiment[:, j] = np.random.normal(0, 1, n)
+    month = pd.to_datetime(panel.dates).month.to_numpy(dtype=np.float64)
+    seasonality = np.sin(2 * np.pi * month / 12)
+    return [
+        ("Sentiment", sentiment),
+        ("Month", np.broadcast_to(month[:, None], (n, k))),
+        ("Seasonality", np.broadcast_to(seasonality[:, None], (n, k))),
+    ]
+
+def compute_panel_feature_list(
+    panel: Panel,
+    feature_groups: Dict[str, bool],
+    technical_names: Optional[List[str]] = None,
+    seeds: Optional[Dict[str, np.ndarray]] = None,
+    seed_row: int = 0,
+    state_out: Optional[Dict[str, np.ndarray]] = None,
+) -> List[Tuple[str, np.ndarray]]:
+    features = [(field, panel.fields[field]) for field in PRICE_FIELDS if field in panel.fields]
+    # One point-in-time load of the reference tables for the whole run
+    reference = ReferenceData(panel.dates, panel.tickers)
+    if feature_groups.get("technical"):
+        features += technical_features(panel, technical_names, seeds, seed_row, state_out)
+    if feature_groups.get("fundamental"):
+        features += fundamental_features(panel, reference)
+    if feature_groups.get("macro"):
+        features += macro_features(panel, reference)
+    if feature_groups.get("alternative"):
+        features += alternative_features(panel)
+    return features
+
+class FeatureBlock:
+    """
+    Engine output: `values` is (tickers, features, dates), which is pandas'
+    column-major layout for the wide frame, so `to_wide` does not copy.
+    """
+    def __init__(self, panel: Panel, names: List[str], values: np.ndarray):
+        self.panel = panel
+        self.names = names
+        self.values = values
+
+    def to_wide(self) -> pd.DataFrame:
+        return wide_from_block(self.panel, self.names, self.values)
+
+    def to_tidy(self) -> pd.DataFrame:
+        # Transposing each (tickers, dates) slice gives rows already sorted by (Date, Ticker)
+        n, k = self.panel.shape
+        out = np.empty((len(self.names), n * k))
+        for j in range(len(self.names)):
+            out[j] = self.values[:, j, :].T.reshape(-1)
+        return tidy_frame(self.panel, self.names, out)
+
+def wide_from_block(panel: Panel, names: List[str], block: np.ndarray) -> pd.DataFrame:
+    n, k = panel.shape
+    columns = [f"{ticker}_{name}" for ticker in panel.tickers for name in names]
+    wide = pd.DataFrame(block.reshape(k * len(names), n).T, columns=columns, copy=False)
+    wide.insert(0, "Date", panel.dates)
+    return wide
+
+def tidy_frame(panel: Panel, names: List[str], values: np.ndarray, start_row: int = 0) -> pd.DataFrame:
+    # `values` is (features, rows) with rows ordered date-major, ticker-minor
+    n, k = panel.shape
+    tidy = pd.DataFrame(values.T, columns=names, copy=False)
+    tidy.insert(0, "Ticker", np.tile(np.asarray(panel.tickers, dtype=object), n - start_row))
+    tidy.insert(0, "Date", np.repeat(panel.dates[start_row:], k))
+    return tidy
+
+def assemble_block(panel: Panel, features: List[Tuple[str, np.ndarray]]) -> FeatureBlock:
+    n, k = panel.shape
+    names = [name for name, _ in features]
+    # Single allocation, ordered {ticker}_{feature}
+    out = np.empty((k, len(names), n))
+    for j, (_, arr) in enumerate(features):
+        out[:, j, :] = arr.T
+    return FeatureBlock(panel, names, out)
+
+def assemble_wide(panel: Panel, features: List[Tuple[str, np.ndarray]]) -> pd.DataFrame:
+    return assemble_block(panel, features).to_wide()
+
+def panel_to_tidy(panel: Panel, features: List[Tuple[str, np.ndarray]], start_row: int = 0) -> pd.DataFrame:
+    # Row-major ravel of each dates x tickers array is already (Date, Ticker) ordered
+    n, k = panel.shape
+    out = np.empty((len(features), (n - start_row) * k))
+    for j, (_, arr) in enumerate(features):
+        out[j] = arr[start_row:].reshape(-1)
+    return tidy_frame(panel, [name for name, _ in features], out, start_row)
+
+def compute_panel_block(
+    df: pd.DataFrame,
+    feature_groups: Dict[str, bool],
+    technical_names: Optional[List[str]] = None,
+) -> Optional[FeatureBlock]:
+    panel = build_panel(df)
+    if not panel.tickers:
+        return None
+    return assemble_block(panel, compute_panel_feature_list(panel, feature_groups, technical_names))
+
+def compute_panel_features(
+    df: pd.DataFrame,
+    feature_groups: Dict[str, bool],
+    technical_names: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    block = compute_panel_block(df, feature_groups, technical_names)
+    return block.to_wide() if block is not None else pd.DataFrame()
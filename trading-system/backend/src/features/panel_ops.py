@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# Column-wise primitives: axis 0 is time, every ticker is handled in one pass
+
+def shift(a: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full_like(a, np.nan)
+    if periods < len(a):
+        out[periods:] = a[:len(a) - periods]
+    return out
+
+def pct_change(a: np.ndarray, periods: int = 1) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return a / shift(a, periods) - 1
+
+def diff(a: np.ndarray, periods: int = 1) -> np.ndarray:
+    return a - shift(a, periods)
+
+def _window_sums(a: np.ndarray, window: int, power: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    valid = np.isfinite(a)
+    vals = np.where(valid, a, 0.0) ** power
+    csum = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(vals, axis=0)])
+    ccount = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(valid, axis=0)])
+    sums = np.full(a.shape, np.nan)
+    counts = np.zeros(a.shape)
+    if window <= len(a):
+        sums[window - 1:] = csum[window:] - csum[:-window]
+        counts[window - 1:] = ccount[window:] - ccount[:-window]
+    return sums, counts
+
+def rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+    sums, counts = _window_sums(a, window)
+    return np.where(counts == window, sums / window, np.nan)
+
+def rolling_std(a: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    # Center each column first so the running sums of squares don't lose precision
+    center = np.zeros(a.shape[1:])
+    finite = np.isfinite(a).any(axis=0)
+    center[finite] = np.nanmean(a[:, finite], axis=0)
+    centered = a - center
+    s1, counts = _window_sums(centered, window)
+    s2, _ = _window_sums(centered, window, power=2)
+    var = np.maximum((s2 - s1 * s1 / window) / (window - ddof), 0.0)
+    return np.where(counts == window, np.sqrt(var), np.nan)
+
+def _rolling_reduce(a: np.ndarray, window: int, func) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    if window <= len(a):
+        view = np.lib.stride_tricks.sliding_window_view(a, window, axis=0)
+        out[window - 1:] = func(view, axis=-1)
+    return out
+
+def rolling_max(a: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_reduce(a, window, np.max)
+
+def rolling_min(a: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_reduce(a, window, np.min)
+
+def ewm_mean(a: np.ndarray, span: int, seed: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Recursive EWM (pandas adjust=False). `seed` is the value of the previous
+    row per column, so a computation can resume where an earlier one stopped.
+    """
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(a)
+    prev = np.full(a.shape[1:], np.nan) if seed is None else np.asarray(seed, dtype=np.float64).copy()
+    # Weight of `prev`; it keeps decaying across NaN rows, as with ignore_na=False
+    weight = np.ones(a.shape[1:])
+    for i in range(len(a)):
+        x = a[i]
+        has_x = ~np.isnan(x)
+        has_prev = ~np.isnan(prev)
+        weight = np.where(has_prev, weight * (1 - alpha), weight)
+        blended = (weight * prev + alpha * x) / (weight + alpha)
+        prev = np.where(has_x & has_prev, blended, np.where(has_prev, prev, x))
+        weight = np.where(has_x, 1.0, weight)
+        out[i] = prev
+    return out
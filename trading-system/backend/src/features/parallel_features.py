@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.features.feature_registry import TECHNICAL_FEATURES
+from src.features.panel_engine import (
+    FeatureBlock, Panel, PRICE_FIELDS, build_panel, compute_panel_feature_list, technical_features,
+)
+
+# Blocks per worker; a few more blocks than workers keeps the pool balanced
+BLOCKS_PER_WORKER = 2
+# Workers start from a clean server process: a forked child would inherit the
+# parent's open DuckDB connection and writer thread
+START_METHOD = "forkserver"
+SHM_DIR = "/dev/shm"
+# Headroom kept free on /dev/shm; containers often cap it at 64 MB and a
+# write past the cap kills the process with SIGBUS
+SHM_HEADROOM = 1.25
+
+def free_bytes(path: str) -> int:
+    st = os.statvfs(path)
+    return st.f_bavail * st.f_frsize
+
+def shared_buffer_dir(needed_bytes: int) -> str:
+    # /dev/shm keeps the memory-mapped buffers in RAM on Linux, when they fit
+    use_shm = os.path.isdir(SHM_DIR) and free_bytes(SHM_DIR) >= needed_bytes * SHM_HEADROOM
+    return tempfile.mkdtemp(prefix="polaris_features_", dir=SHM_DIR if use_shm else None)
+
+def ticker_blocks(n_tickers: int, n_blocks: int) -> List[Tuple[int, int]]:
+    bounds = np.linspace(0, n_tickers, min(n_blocks, n_tickers) + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+def technical_block_worker(
+    in_path: str,
+    out_path: str,
+    fields: List[str],
+    shape: Tuple[int, int, int],
+    lo: int,
+    hi: int,
+    technical_names: List[str],
+) -> int:
+    n, k, m = shape
+    inp = np.memmap(in_path, dtype=np.float64, mode="r", shape=(len(fields), n, k))
+    out = np.memmap(out_path, dtype=np.float64, mode="r+", shape=(k, m, n))
+    block = {field: np.asarray(inp[i, :, lo:hi]) for i, field in enumerate(fields)}
+    features = list(block.items())
+    if technical_names:
+        features += technical_features(Panel(np.arange(n), [""] * (hi - lo), block), technical_names)
+    for j, (_, arr) in enumerate(features):
+        out[lo:hi, j, :] = arr.T
+    out.flush()
+    return hi - lo
+
+def compute_panel_block_parallel(
+    df: pd.DataFrame,
+    feature_groups: Dict[str, bool],
+    workers: int,
+    technical_names: Optional[List[str]] = None,
+) -> Optional[FeatureBlock]:
+    """
+    Split the ticker axis across a process pool. Inputs and outputs are
+    memory-mapped buffers, so workers neither receive nor return pickled frames.
+    """
+    panel = build_panel(df)
+    if not panel.tickers:
+        return None
+    n, k = panel.shape
+    fields = [f for f in PRICE_FIELDS if f in panel.fields]
+    technical_names = (technical_names or TECHNICAL_FEATURES) if feature_groups.get("technical") else []
+    # Table-backed groups are cheap lookups and stay in the parent process
+    others = compute_panel_feature_list(panel, dict(feature_groups, technical=False))[len(fields):]
+    names = fields + list(technical_names) + [name for name, _ in others]
+    m = len(names)
+
+    tmp_dir = shared_buffer_dir(8 * (len(fields) * n * k + k * m * n))
+    try:
+        in_path = os.path.join(tmp_dir, "input.f64")
+        out_path = os.path.join(tmp_dir, "output.f64")
+        inp = np.memmap(in_path, dtype=np.float64, mode="w+", shape=(len(fields), n, k))
+        for i, field in enumerate(fields):
+            inp[i] = panel.fields[field]
+        inp.flush()
+        del inp
+        out = np.memmap(out_path, dtype=np.float64, mode="w+", shape=(k, m, n))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+            futures = [
+                pool.submit(technical_block_worker, in_path, out_path, fields, (n, k, m), lo, hi, technical_names)
+                for lo, hi in ticker_blocks(k, workers * BLOCKS_PER_WORKER)
+            ]
+            for fut in futures:
+                fut.result()
+        offset = m - len(others)
+        for j, (_, arr) in enumerate(others):
+            out[:, offset + j, :] = arr.T
+        # The mapping stays valid after the backing file is removed
+        return FeatureBlock(panel, names, out.view(np.ndarray))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def compute_panel_features_parallel(
+    df: pd.DataFrame,
+    feature_groups: Dict[str, bool],
+    workers: int,
+    technical_names: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    block = compute_panel_block_parallel(df, feature_groups, workers, technical_names)
+    return block.to_wide() if block is not None else pd.DataFrame()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from src.utils.duckdb_helpers import get_con
+
+FUNDAMENTAL_TABLE = "fundamental_data"   # Date, Ticker, PE, PB, PS, DivYld (report dates)
+MACRO_TABLE = "macro_data"               # Date, FFR, CPI, Unemployment, YieldCurve, ...
+FUNDAMENTAL_COLUMNS = ["PE", "PB", "PS", "DivYld"]
+
+def load_fundamentals_asof(dates: pd.DatetimeIndex, tickers: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Latest fundamentals known on each (Date, Ticker), carried forward with an
+    ASOF join. Ticker and date filters are pushed down into DuckDB.
+    """
+    grid = pd.DataFrame({
+        "Date": np.repeat(dates.to_numpy(), len(tickers)),
+        "Ticker": np.tile(np.asarray(tickers, dtype=object), len(dates)),
+    })
+    cols = ", ".join(f"r.{c}" for c in FUNDAMENTAL_COLUMNS)
+    query = f"""
+        SELECT g.Date, g.Ticker, {cols}
+        FROM grid g
+        ASOF LEFT JOIN (
+            SELECT Ticker, CAST(Date AS TIMESTAMP) AS Date, {", ".join(FUNDAMENTAL_COLUMNS)}
+            FROM {FUNDAMENTAL_TABLE}
+            WHERE Ticker IN (SELECT unnest(?)) AND CAST(Date AS TIMESTAMP) <= ?
+        ) r
+        ON g.Ticker = r.Ticker AND g.Date >= r.Date
+    """
+    try:
+        with get_con() as con:
+            con.register("grid", grid)
+            return con.execute(query, [list(tickers), dates.max().to_pydatetime()]).df()
+    except Exception:
+        return None
+
+def load_macro_asof(dates: pd.DatetimeIndex) -> Optional[pd.DataFrame]:
+    grid = pd.DataFrame({"Date": dates.to_numpy()})
+    query = f"""
+        SELECT g.Date, r.* EXCLUDE (Date)
+        FROM grid g
+        ASOF LEFT JOIN (
+            SELECT * REPLACE (CAST(Date AS TIMESTAMP) AS Date)
+            FROM {MACRO_TABLE}
+            WHERE CAST(Date AS TIMESTAMP) <= ?
+        ) r
+        ON g.Date >= r.Date
+    """
+    try:
+        with get_con() as con:
+            con.register("grid", grid)
+            return con.execute(query, [dates.max().to_pydatetime()]).df()
+    except Exception:
+        return None
+
+class ReferenceData:
+    """
+    Fundamental and macro tables aligned point-in-time to one run's dates and
+    tickers. Each table is read at most once per run.
+    """
+    def __init__(self, dates, tickers: List[str]):
+        self.dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        self.tickers = list(tickers)
+        self._fundamentals: Optional[pd.DataFrame] = None
+        self._macro: Optional[pd.DataFrame] = None
+        self._loaded = set()
+
+    @property
+    def fundamentals(self) -> Optional[pd.DataFrame]:
+        if "fundamentals" not in self._loaded:
+            self._fundamentals = load_fundamentals_asof(self.dates, self.tickers)
+            self._loaded.add("fundamentals")
+        return self._fundamentals
+
+    @property
+    def macro(self) -> Optional[pd.DataFrame]:
+        if "macro" not in self._loaded:
+            self._macro = load_macro_asof(self.dates)
+            self._loaded.add("macro")
+        return self._macro
+
+    def fundamental_arrays(self) -> Optional[Dict[str, np.ndarray]]:
+        fund = self.fundamentals
+        if fund is None:
+            return None
+        return {
+            col: fund.pivot(index="Date", columns="Ticker", values=col)
+                     .reindex(index=self.dates, columns=self.tickers).to_numpy(dtype=np.float64)
+            for col in FUNDAMENTAL_COLUMNS
+        }
+
+    def fundamentals_for(self, ticker: str) -> Optional[pd.DataFrame]:
+        fund = self.fundamentals
+        if fund is None:
+            return None
+        return fund[fund["Ticker"] == ticker].drop(columns=["Ticker"])
+
+    def macro_frame(self) -> Optional[pd.DataFrame]:
+        macro = self.macro
+        if macro is None:
+            return None
+        return macro.set_index("Date").reindex(self.dates)
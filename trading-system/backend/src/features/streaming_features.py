@@ -0,0 +1,103 @@
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from src.features.cross_sectional import add_cross_sectional_features, cross_sectional_names
+from src.features.incremental_features import save_feature_state
+from src.features.tidy_feature_engineering import create_wide_features_view
+from src.features.feature_registry import TECHNICAL_FEATURES, required_lookback
+from src.features.panel_engine import build_panel, compute_panel_feature_list, panel_to_tidy, assemble_wide
+from src.utils.duckdb_helpers import get_con, run_query, run_write, write_table, append_table, drop_relation, table_written, COMPACT_STORAGE
+
+# Dates per chunk; peak memory is roughly (CHUNK_ROWS + lookback) x tickers x features
+CHUNK_ROWS = 1000
+
+def read_date_range(table: str, start, end) -> pd.DataFrame:
+    with get_con() as con:
+        return con.execute(f"SELECT * FROM {table} WHERE Date >= ? AND Date <= ? ORDER BY Date", [start, end]).df()
+
+def swap_table(staging: str, table: str) -> None:
+    def swap(con):
+        con.execute("BEGIN TRANSACTION")
+        drop_relation(con, table)
+        con.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        table_written(con, table)
+        con.execute("COMMIT")
+    run_write(swap)
+
+def drop_staging() -> None:
+    # No-op after a successful swap; clears a failed run's partial tables
+    def drop(con):
+        drop_relation(con, "features_tidy__staging")
+        drop_relation(con, "features__staging")
+    run_write(drop)
+
+def stream_features(
+    feature_groups: Dict[str, bool],
+    source_table: str = "cleaned",
+    chunk_rows: int = CHUNK_ROWS,
+    technical_names: Optional[List[str]] = None,
+    write_wide: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compute features over the time axis in chunks of `chunk_rows` dates. Each
+    chunk is read with just enough trailing input rows for the rolling windows,
+    EWMs resume from the previous chunk's last values, and finished rows are
+    appended to DuckDB before the next chunk is loaded. Unless `write_wide`,
+    `features` is a PIVOT view over `features_tidy`.
+    """
+    dates = run_query(f"SELECT DISTINCT Date FROM {source_table} ORDER BY Date")["Date"]
+    names = technical_names or TECHNICAL_FEATURES
+    lookback = required_lookback(names) if feature_groups.get("technical") else 0
+    if chunk_rows < lookback:
+        print(f"[INFO] chunk_rows {chunk_rows} is below the {lookback}-row lookback, using {lookback}")
+        chunk_rows = lookback
+    carry: Optional[pd.DataFrame] = None
+    seeds: Dict[str, Any] = {}
+    schema: List[str] = []
+    last_tidy = None
+    row_count = 0
+    try:
+        for i, start in enumerate(range(0, len(dates), chunk_rows)):
+            chunk_dates = dates.iloc[start:start + chunk_rows]
+            chunk = read_date_range(source_table, chunk_dates.iloc[0], chunk_dates.iloc[-1])
+            frame = pd.concat([carry, chunk], ignore_index=True) if carry is not None else chunk
+            offset = len(frame) - len(chunk)
+            panel = build_panel(frame)
+            state: Dict[str, Any] = {}
+            features = compute_panel_feature_list(panel, feature_groups, names, seeds, offset, state)
+            tidy = panel_to_tidy(panel, features, start_row=offset)
+            if i == 0:
+                # Fixed from the planned names: a feature with no values yet (long
+                # lookback, late fundamentals) still gets its cross-sectional columns
+                schema = list(tidy.columns)
+                if feature_groups.get("cross_sectional"):
+                    schema += cross_sectional_names([name for name, _ in features])
+            if feature_groups.get("cross_sectional"):
+                tidy = add_cross_sectional_features(tidy)
+            tidy = tidy.reindex(columns=schema)
+            if i == 0:
+                write_table(tidy, "features_tidy__staging", compact=COMPACT_STORAGE)
+            else:
+                append_table(tidy, "features_tidy__staging")
+            if write_wide:
+                wide = assemble_wide(panel, features).iloc[offset:]
+                if i == 0:
+                    write_table(wide, "features__staging", compact=COMPACT_STORAGE)
+                else:
+                    append_table(wide, "features__staging")
+            row_count += len(tidy)
+            last_tidy = tidy
+            carry = frame.iloc[max(0, len(frame) - lookback):] if lookback else None
+            seeds = state
+            print(f"[INFO] Feature chunk {i}: {chunk_dates.iloc[0]} -> {chunk_dates.iloc[-1]} ({len(tidy)} rows)")
+        if last_tidy is None:
+            return {"success": False, "error": f"No rows in '{source_table}'"}
+        swap_table("features_tidy__staging", "features_tidy")
+        if write_wide:
+            swap_table("features__staging", "features")
+    finally:
+        drop_staging()
+    if not write_wide:
+        create_wide_features_view([name for name, _ in features], panel.tickers)
+    # Resume point for incremental mode
+    save_feature_state(last_tidy)
+    return {"success": True, "mode": "stream", "row_count": row_count, "chunks": i + 1}
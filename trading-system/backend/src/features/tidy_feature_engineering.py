@@ -1,6 +1,7 @@
 import pandas as pd
+from typing import List
 from src.utils.pandas_helpers import flatten_columns
-from src.utils.duckdb_helpers import read_table, write_table
+from src.utils.duckdb_helpers import read_table, write_table, create_pivot_view
 
 def wide_to_tidy_features(df: pd.DataFrame) -> pd.DataFrame:
     df = flatten_columns(df)
@@ -21,6 +22,11 @@ def wide_to_tidy_features(df: pd.DataFrame) -> pd.DataFrame:
     tidy = tidy.drop_duplicates(subset=["Date", "Ticker"], keep="last")
     return tidy
 
+def create_wide_features_view(feature_names: List[str], tickers: List[str]) -> None:
+    # `features` is derived from `features_tidy` on read instead of stored twice;
+    # cross-sectional columns only exist in the tidy table.
+    create_pivot_view("features", "features_tidy", feature_names, tickers)
+
 if __name__ == "__main__":
     df = read_table("features")
     tidy = wide_to_tidy_features(df)
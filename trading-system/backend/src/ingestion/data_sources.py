@@ -0,0 +1,311 @@
+import os
+import re
+import glob
+import zlib
+import duckdb
+import threading
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
+from src.utils.bar_storage import BAR_FIELDS
+from src.utils.duckdb_helpers import quote_ident
+from src.utils.trading_calendar import TradingCalendar, get_calendar
+from src.ingestion.scheduler import SinkFn
+
+# Parallel file readers for local dumps
+READ_WORKERS = 4
+FILE_PATTERNS = ("*.csv", "*.csv.gz", "*.parquet")
+# Longest first, so "BRK.B.csv.gz" loses ".csv.gz" and keeps its ticker dot
+FILE_SUFFIXES = (".csv.gz", ".csv", ".parquet")
+# Dumps the API may read; paths sent to /ingest/files resolve under it
+IMPORT_DIR = os.path.abspath(os.environ.get(
+    "POLARIS_IMPORT_DIR", os.path.join(os.path.dirname(__file__), "../../../data/imports")
+))
+
+# Vendor column spellings, compared lowercased with non-letters dropped
+COLUMN_ALIASES = {
+    "Date": ["date", "datetime", "timestamp", "time", "day"],
+    "Ticker": ["ticker", "symbol", "sym", "code"],
+    "Open": ["open", "o"],
+    "High": ["high", "h"],
+    "Low": ["low", "l"],
+    "Close": ["close", "c", "last"],
+    "Adj Close": ["adjclose", "adjustedclose", "adjusted"],
+    "Volume": ["volume", "vol", "v"],
+}
+
+class DataSource(ABC):
+    # fetch(tickers, start, end, interval) -> long (Date, Ticker, fields) or
+    # yfinance-shaped bars for [start, end), None when empty. Callable, so a
+    # source plugs into IngestionScheduler as its fetch function.
+    name = "base"
+    # Requests per second the scheduler should hold this source to
+    rate_limit: Optional[float] = None
+
+    @abstractmethod
+    def fetch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        ...
+
+    def __call__(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        return self.fetch(tickers, start, end, interval)
+
+def long_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.reindex(columns=["Date", "Ticker"] + BAR_FIELDS)
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    frame["Ticker"] = frame["Ticker"].astype(str)
+    return frame.sort_values(["Ticker", "Date"], ignore_index=True)
+
+def column_key(name: str) -> str:
+    return re.sub(r"[^a-z]", "", name.lower())
+
+def is_within(path: str, root: str) -> bool:
+    # Symlinks are resolved, so a link out of `root` is outside it
+    real, base = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([real, base]) == base
+
+class LocalFileSource(DataSource):
+    # Vendor CSV / Parquet dumps under `path` (file, directory or glob): long
+    # files with a ticker column, or one ticker per file named by its stem
+    name = "files"
+
+    def __init__(self, path: str, workers: int = READ_WORKERS, root: Optional[str] = None):
+        # With `root`, `path` is taken relative to it and may not leave it
+        if root is not None:
+            path = os.path.join(root, path)
+            if not is_within(path, root):
+                raise ValueError(f"Path '{path}' is outside the import directory")
+        self.path = path
+        self.root = root
+        self.workers = max(1, workers)
+        # path -> (column mapping, tickers in the file); built on first fetch
+        self._index: Optional[Dict[str, Tuple[Dict[str, str], Set[str]]]] = None
+        self._index_lock = threading.Lock()
+
+    def files(self) -> List[str]:
+        if os.path.isfile(self.path):
+            return [self.path] if self.root is None or is_within(self.path, self.root) else []
+        if os.path.isdir(self.path):
+            found = [f for p in FILE_PATTERNS for f in glob.glob(os.path.join(self.path, "**", p), recursive=True)]
+        else:
+            found = glob.glob(self.path, recursive=True)
+        if self.root is not None:
+            found = [f for f in found if is_within(f, self.root)]
+        return sorted(set(found))
+
+    @staticmethod
+    def file_ticker(path: str) -> str:
+        name = os.path.basename(path)
+        suffix = next((s for s in FILE_SUFFIXES if name.lower().endswith(s)), "")
+        return name[:len(name) - len(suffix)].upper()
+
+    @staticmethod
+    def reader(path: str) -> str:
+        escaped = path.replace("'", "''")
+        if path.endswith(".parquet"):
+            return f"read_parquet('{escaped}')"
+        return f"read_csv('{escaped}')"
+
+    def column_map(self, con: duckdb.DuckDBPyConnection, path: str) -> Optional[Dict[str, str]]:
+        # Canonical field -> quoted source column; None if the file has no bars
+        names = [d[0] for d in con.execute(f"SELECT * FROM {self.reader(path)} LIMIT 0").description]
+        by_key = {column_key(n): n for n in names}
+        mapped: Dict[str, str] = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            match = next((by_key[a] for a in aliases if a in by_key), None)
+            if match is not None:
+                mapped[field] = quote_ident(match)
+        if "Date" not in mapped or "Close" not in mapped:
+            print(f"[INFO] Skipping {path}: no Date/Close columns in {names}")
+            return None
+        mapped.setdefault("Adj Close", mapped["Close"])
+        return mapped
+
+    def ticker_expr(self, path: str, mapped: Dict[str, str]) -> str:
+        if "Ticker" in mapped:
+            return f"upper(CAST({mapped['Ticker']} AS VARCHAR))"
+        return "'" + self.file_ticker(path).replace("'", "''") + "'"
+
+    def scan_file(self, path: str) -> Optional[Tuple[Dict[str, str], Set[str]]]:
+        con = duckdb.connect()
+        try:
+            mapped = self.column_map(con, path)
+            if mapped is None:
+                return None
+            if "Ticker" not in mapped:
+                return mapped, {self.file_ticker(path)}
+            rows = con.execute(f"SELECT DISTINCT {self.ticker_expr(path, mapped)} FROM {self.reader(path)}").fetchall()
+            return mapped, {r[0] for r in rows}
+        finally:
+            con.close()
+
+    def index(self) -> Dict[str, Tuple[Dict[str, str], Set[str]]]:
+        with self._index_lock:
+            if self._index is None:
+                files = self.files()
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="files") as pool:
+                    scanned = list(pool.map(self.scan_file, files))
+                self._index = {path: entry for path, entry in zip(files, scanned) if entry is not None}
+            return self._index
+
+    def read_file(
+        self,
+        path: str,
+        tickers: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        mapped: Optional[Dict[str, str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        # Column mapping, ticker and date window are applied in SQL
+        con = duckdb.connect()
+        try:
+            mapped = mapped or self.column_map(con, path)
+            if mapped is None:
+                return None
+            if "Ticker" not in mapped and tickers and self.file_ticker(path) not in tickers:
+                return None
+            fields = ", ".join(
+                f"CAST({mapped[f]} AS DOUBLE) AS {quote_ident(f)}" if f in mapped else f"CAST(NULL AS DOUBLE) AS {quote_ident(f)}"
+                for f in BAR_FIELDS
+            )
+            where, params = [], []
+            if tickers and "Ticker" in mapped:
+                where.append(f"Ticker IN ({', '.join('?' for _ in tickers)})")
+                params += list(tickers)
+            if start is not None:
+                where.append("Date >= CAST(? AS TIMESTAMP)")
+                params.append(str(start))
+            if end is not None:
+                where.append("Date < CAST(? AS TIMESTAMP)")
+                params.append(str(end))
+            query = (
+                f"SELECT * FROM (SELECT CAST({mapped['Date']} AS TIMESTAMP) AS Date, {self.ticker_expr(path, mapped)} AS Ticker, "
+                f"{fields} FROM {self.reader(path)})" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY Ticker, Date"
+            )
+            frame = con.execute(query, params).df()
+        finally:
+            con.close()
+        return frame if not frame.empty else None
+
+    def stream(
+        self,
+        sink: SinkFn,
+        tickers: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        # At most `workers` files are parsed or waiting for `sink` at a time
+        tickers = [t.upper() for t in tickers] if tickers else None
+        files = self.files()
+        queued = iter(files)
+        stored, failed = [], []
+        row_count = 0
+        dates: List[Any] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="files") as pool:
+            pending: Dict[Future, str] = {}
+
+            def submit_next() -> None:
+                path = next(queued, None)
+                if path is not None:
+                    pending[pool.submit(self.read_file, path, tickers, start, end)] = path
+
+            for _ in range(self.workers):
+                submit_next()
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        frame = future.result()
+                        if frame is not None:
+                            row_count += sink(frame)
+                            stored += frame["Ticker"].unique().tolist()
+                            dates += [frame["Date"].min(), frame["Date"].max()]
+                    except Exception as e:
+                        failed.append({"file": path, "error": str(e)})
+                    frame = None
+                    submit_next()
+        print(f"[INFO] Streamed {len(files) - len(failed)}/{len(files)} files from {self.path}: {row_count} rows")
+        return {
+            "success": not failed,
+            "files": len(files),
+            "tickers": sorted(set(stored)),
+            "row_count": int(row_count),
+            "start_date": str(min(dates)) if dates else None,
+            "end_date": str(max(dates)) if dates else None,
+            "failed": failed,
+        }
+
+    def fetch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        # Only the files holding a requested ticker are read
+        wanted = {t.upper() for t in tickers}
+        jobs = [(path, mapped) for path, (mapped, held) in self.index().items() if held & wanted]
+        if not jobs:
+            return None
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="files") as pool:
+            frames = [
+                f for f in pool.map(lambda job: self.read_file(job[0], sorted(wanted), start, end, job[1]), jobs)
+                if f is not None
+            ]
+        if not frames:
+            return None
+        return long_frame(pd.concat(frames, ignore_index=True))
+
+class SyntheticSource(DataSource):
+    # Random walk per ticker seeded from (seed, ticker) and drawn from `origin`,
+    # so a (ticker, date) bar does not depend on the requested window
+    name = "synthetic"
+
+    def __init__(
+        self,
+        seed: int = 0,
+        origin: str = "2000-01-03",
+        drift: float = 0.0003,
+        volatility: float = 0.02,
+        calendar: Optional[TradingCalendar] = None,
+    ):
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.drift = drift
+        self.volatility = volatility
+        self.calendar = calendar or get_calendar()
+
+    def ticker_bars(self, ticker: str, sessions: pd.DatetimeIndex) -> np.ndarray:
+        # Columns: Open, High, Low, Close, Volume. One draw row per session,
+        # so a longer history extends a shorter one rather than reshuffling it
+        salt = zlib.crc32(ticker.encode())
+        rng = np.random.default_rng([self.seed, salt])
+        z = rng.standard_normal((len(sessions), 5))
+        close = (20 + salt % 480) * np.exp(np.cumsum(self.drift + self.volatility * z[:, 0]))
+        prev = np.concatenate([[close[0]], close[:-1]])
+        open_ = prev * np.exp(self.volatility / 4 * z[:, 1])
+        high = np.maximum(open_, close) * (1 + self.volatility / 2 * np.abs(z[:, 2]))
+        low = np.minimum(open_, close) * (1 - self.volatility / 2 * np.abs(z[:, 3]))
+        volume = np.round(np.exp(14 + 0.5 * z[:, 4]))
+        return np.column_stack([open_, high, low, close, volume])
+
+    def fetch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        if interval != "1d":
+            raise ValueError(f"SyntheticSource only generates daily bars, got interval '{interval}'")
+        sessions = self.calendar.sessions(self.origin, pd.Timestamp(end) - pd.Timedelta(days=1))
+        keep = sessions >= pd.Timestamp(start)
+        dates = sessions[keep]
+        if len(dates) == 0 or not tickers:
+            return None
+        values = np.vstack([self.ticker_bars(t, sessions)[keep] for t in tickers])
+        frame = pd.DataFrame(values, columns=["Open", "High", "Low", "Close", "Volume"])
+        frame.insert(0, "Ticker", np.repeat(list(tickers), len(dates)))
+        frame.insert(0, "Date", np.tile(dates.to_numpy(), len(tickers)))
+        frame["Adj Close"] = frame["Close"]
+        return long_frame(frame)
+
+def get_source(name: str = "yahoo", **options) -> DataSource:
+    if name == "yahoo":
+        from src.ingestion.yahoo_ingest import YahooSource
+        return YahooSource()
+    if name == "files":
+        return LocalFileSource(**options)
+    if name == "synthetic":
+        return SyntheticSource(**options)
+    raise KeyError(f"Unknown data source '{name}'")
@@ -0,0 +1,147 @@
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.bar_storage import bars_table, ensure_bars_table
+from src.utils.coverage import read_coverage
+from src.utils.duckdb_helpers import get_con, relation_type, run_write
+from src.utils.trading_calendar import TradingCalendar, get_calendar
+
+# Gaps separated by at most this many stored sessions are fetched as one range
+MERGE_SESSIONS = 5
+# Sessions this recent that came back empty are retried rather than recorded
+# (vendors publish late)
+RECHECK_SESSIONS = 5
+
+# Sessions a source was asked for and returned nothing (pre-listing,
+# post-delisting, halts, vendor holes); the planner skips them
+UNAVAILABLE_DDL = """
+CREATE TABLE IF NOT EXISTS unavailable_sessions (
+    Ticker VARCHAR,
+    gap_start TIMESTAMP,
+    gap_end TIMESTAMP,
+    recorded_at TIMESTAMP
+);
+"""
+
+# (tickers, start, end) with `end` exclusive, as yf.download takes it
+FetchRange = Tuple[List[str], str, str]
+
+def missing_sessions(tickers: List[str], sessions: pd.DatetimeIndex, table: str) -> Dict[str, List[Tuple[int, int]]]:
+    # Per ticker, runs of sessions with no stored Close as (first, last) positions
+    if not tickers or len(sessions) == 0:
+        return {}
+    session_frame = pd.DataFrame({"Date": sessions.to_numpy(), "idx": range(len(sessions))})
+    ticker_frame = pd.DataFrame({"Ticker": tickers})
+    with get_con() as con:
+        con.register("plan_sessions", session_frame)
+        con.register("plan_tickers", ticker_frame)
+        skip_unavailable = (
+            "  ANTI JOIN unavailable_sessions u ON u.Ticker = t.Ticker AND s.Date BETWEEN u.gap_start AND u.gap_end"
+            if relation_type(con, "unavailable_sessions") is not None else ""
+        )
+        try:
+            rows = con.execute(
+                "WITH have AS ("
+                f"  SELECT Ticker, Date FROM {table} "
+                "  WHERE Close IS NOT NULL AND Date >= ? AND Date <= ? AND Ticker IN (SELECT Ticker FROM plan_tickers)"
+                "), missing AS ("
+                "  SELECT t.Ticker, s.idx FROM plan_tickers t CROSS JOIN plan_sessions s "
+                "  ANTI JOIN have h ON h.Ticker = t.Ticker AND h.Date = s.Date"
+                f"{skip_unavailable}"
+                ") "
+                "SELECT Ticker, min(idx), max(idx) FROM ("
+                "  SELECT Ticker, idx, idx - row_number() OVER (PARTITION BY Ticker ORDER BY idx) AS run FROM missing"
+                ") GROUP BY Ticker, run ORDER BY Ticker, 2",
+                [sessions[0], sessions[-1]],
+            ).fetchall()
+        finally:
+            con.unregister("plan_sessions")
+            con.unregister("plan_tickers")
+    runs: Dict[str, List[Tuple[int, int]]] = {}
+    for ticker, first, last in rows:
+        runs.setdefault(ticker, []).append((int(first), int(last)))
+    return runs
+
+def merge_runs(runs: List[Tuple[int, int]], max_between: int = MERGE_SESSIONS) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for first, last in sorted(runs):
+        if merged and first - merged[-1][1] - 1 <= max_between:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+def plan_gaps(
+    tickers: List[str],
+    start: Any,
+    end: Any,
+    calendar: Optional[TradingCalendar] = None,
+    max_between: int = MERGE_SESSIONS,
+) -> List[FetchRange]:
+    # Missing runs merged across short stored stretches; identical ranges share a request
+    calendar = calendar or get_calendar()
+    # A session still trading would be stored partial and never refreshed
+    last = min(pd.Timestamp(end) - pd.Timedelta(days=1), calendar.last_completed_session())
+    sessions = calendar.sessions(start, last)
+    if len(sessions) == 0:
+        return []
+    table = ensure_bars_table("raw")
+    # Tickers with no stored bars and nothing recorded as unavailable skip the anti-join
+    known = set(read_coverage(bars_table("raw"), tickers)) | unavailable_tickers(tickers)
+    runs = {t: [(0, len(sessions) - 1)] for t in tickers if t not in known}
+    runs.update(missing_sessions([t for t in tickers if t in known], sessions, table))
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for ticker, ticker_runs in runs.items():
+        for first, last_idx in merge_runs(ticker_runs, max_between):
+            fetch_start = sessions[first].strftime("%Y-%m-%d")
+            fetch_end = (sessions[last_idx] + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            groups.setdefault((fetch_start, fetch_end), []).append(ticker)
+    return [(sorted(group), s, e) for (s, e), group in sorted(groups.items())]
+
+def unavailable_tickers(tickers: List[str]) -> set:
+    with get_con() as con:
+        if relation_type(con, "unavailable_sessions") is None or not tickers:
+            return set()
+        rows = con.execute(
+            f"SELECT DISTINCT Ticker FROM unavailable_sessions WHERE Ticker IN ({', '.join('?' for _ in tickers)})",
+            [str(t) for t in tickers],
+        ).fetchall()
+    return {r[0] for r in rows}
+
+def clear_unavailable(tickers: Optional[List[str]] = None) -> None:
+    def clear(con):
+        if relation_type(con, "unavailable_sessions") is None:
+            return
+        if tickers:
+            con.execute(
+                f"DELETE FROM unavailable_sessions WHERE Ticker IN ({', '.join('?' for _ in tickers)})",
+                [str(t) for t in tickers],
+            )
+        else:
+            con.execute("DELETE FROM unavailable_sessions")
+    run_write(clear)
+
+def record_unavailable(ranges: List[FetchRange], calendar: Optional[TradingCalendar] = None) -> int:
+    # `ranges` hold only tickers the source returned rows for: an empty answer
+    # may be a rate limit or network error and is retried instead of recorded.
+    # The last RECHECK_SESSIONS sessions are left to retry as well.
+    calendar = calendar or get_calendar()
+    settled = calendar.last_completed_session() - RECHECK_SESSIONS * calendar.offset
+    table = ensure_bars_table("raw")
+    rows = []
+    for tickers, start, end in ranges:
+        sessions = calendar.sessions(start, min(pd.Timestamp(end) - pd.Timedelta(days=1), settled))
+        for ticker, runs in missing_sessions(tickers, sessions, table).items():
+            rows += [(ticker, sessions[first], sessions[last]) for first, last in runs]
+    if not rows:
+        return 0
+    frame = pd.DataFrame(rows, columns=["Ticker", "gap_start", "gap_end"])
+
+    def record(con):
+        con.execute(UNAVAILABLE_DDL)
+        con.register("unavailable_frame", frame)
+        try:
+            con.execute("INSERT INTO unavailable_sessions SELECT Ticker, gap_start, gap_end, now() FROM unavailable_frame")
+        finally:
+            con.unregister("unavailable_frame")
+    run_write(record)
+    return len(rows)
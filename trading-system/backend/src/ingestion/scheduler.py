@@ -0,0 +1,145 @@
+import time
+import threading
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Tickers per request, concurrent requests, and the request rate they share
+BATCH_SIZE = 50
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 2.0
+BURST = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 5
+
+# fetch(tickers, start, end, interval) -> bars for those tickers (None / empty: no data)
+FetchFn = Callable[[List[str], str, str, str], Optional[pd.DataFrame]]
+# sink(frame) -> rows stored
+SinkFn = Callable[[pd.DataFrame], int]
+
+def frame_tickers(frame: pd.DataFrame, batch: List[str]) -> List[str]:
+    # Tickers the response holds a Close for: long frames, or yfinance's (ticker, field) columns
+    if "Ticker" in frame.columns:
+        return frame.loc[frame["Close"].notna(), "Ticker"].astype(str).unique().tolist()
+    if isinstance(frame.columns, pd.MultiIndex):
+        return [t for t in batch if (t, "Close") in frame.columns and frame[(t, "Close")].notna().any()]
+    return list(batch)
+
+class TokenBucket:
+    # `rate` tokens per second, at most `capacity` banked
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            self.sleep(wait_for)
+
+class IngestionScheduler:
+    # A batch out of retries is split in half, isolating a bad symbol
+    def __init__(
+        self,
+        fetch: FetchFn,
+        sink: SinkFn,
+        batch_size: int = BATCH_SIZE,
+        max_workers: int = MAX_WORKERS,
+        rate: Optional[float] = REQUESTS_PER_SECOND,
+        burst: float = BURST,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = RETRY_BACKOFF,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.fetch = fetch
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        # No rate: a local source that needs no throttling
+        self.limiter = TokenBucket(rate, burst, sleep=sleep) if rate else None
+        self.max_retries = max(1, max_retries)
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def batches(self, tickers: List[str]) -> List[List[str]]:
+        return [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+
+    def fetch_batch(self, tickers: List[str], start: str, end: str, interval: str) -> Tuple[Optional[pd.DataFrame], int]:
+        # Returns (frame, attempts); raises the last error once out of retries
+        for attempt in range(self.max_retries):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                return self.fetch(tickers, start, end, interval), attempt + 1
+            except Exception as e:
+                print(f"[INFO] Batch {tickers[0]}..{tickers[-1]} failed (attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries - 1:
+                    raise
+                self.sleep(self.backoff * (2 ** attempt))
+
+    def run(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Dict[str, Any]:
+        return self.run_plan([(tickers, start, end)], interval)
+
+    def run_plan(self, ranges: List[Tuple[List[str], str, str]], interval: str = "1d") -> Dict[str, Any]:
+        # `ranges`: (tickers, start, end) requests, each split into batches
+        stored, failed = [], []
+        # (tickers with rows, start, end) per answered request
+        returned: List[Tuple[List[str], str, str]] = []
+        row_count, requests = 0, 0
+        dates: List[Any] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest") as pool:
+            pending: Dict[Future, Tuple[List[str], str, str]] = {}
+
+            def submit(batch: List[str], start: str, end: str) -> None:
+                pending[pool.submit(self.fetch_batch, batch, start, end, interval)] = (batch, start, end)
+
+            for tickers, start, end in ranges:
+                for batch in self.batches(tickers):
+                    submit(batch, start, end)
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, start, end = pending.pop(future)
+                    try:
+                        frame, attempts = future.result()
+                    except Exception as e:
+                        requests += self.max_retries
+                        if len(batch) > 1:
+                            half = len(batch) // 2
+                            submit(batch[:half], start, end)
+                            submit(batch[half:], start, end)
+                        else:
+                            failed.append({"tickers": batch, "start": start, "end": end, "error": str(e)})
+                        continue
+                    requests += attempts
+                    if frame is None or frame.empty:
+                        continue
+                    try:
+                        row_count += self.sink(frame)
+                    except Exception as e:
+                        failed.append({"tickers": batch, "start": start, "end": end, "error": f"store failed: {e}"})
+                        continue
+                    stored += batch
+                    returned.append((frame_tickers(frame, batch), start, end))
+                    dates += [frame.index.min(), frame.index.max()] if "Date" not in frame.columns else [frame["Date"].min(), frame["Date"].max()]
+        return {
+            "success": bool(stored) or not failed,
+            "tickers": list(dict.fromkeys(stored)),
+            "row_count": int(row_count),
+            "start_date": str(min(dates)) if dates else None,
+            "end_date": str(max(dates)) if dates else None,
+            "requests": requests,
+            "failed": failed,
+            "returned": returned,
+        }
@@ -1,65 +1,54 @@
-import time
 from typing import List, Optional, Dict, Any
-import yfinance as yf
 import pandas as pd
-from src.utils.duckdb_helpers import write_table, read_table
+from src.utils.bar_storage import upsert_bars
 from src.utils.pandas_helpers import flatten_columns
+from src.ingestion.scheduler import BATCH_SIZE, MAX_WORKERS, REQUESTS_PER_SECOND, FetchFn, IngestionScheduler
+from src.ingestion.gap_planner import clear_unavailable, plan_gaps, record_unavailable
+from src.ingestion.data_sources import READ_WORKERS, DataSource, LocalFileSource
 
-MAX_RETRIES = 3
-RETRY_BACKOFF = 5
+try:
+    import yfinance as yf
+    HAS_YFINANCE = True
+except ImportError:
+    HAS_YFINANCE = False
 
-def fetch_yahoo_data(
+class YahooSource(DataSource):
+    name = "yahoo"
+    rate_limit = REQUESTS_PER_SECOND
+
+    def fetch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        # One request; errors propagate so the scheduler can retry just this batch
+        if not HAS_YFINANCE:
+            raise ImportError("yfinance is not installed; use a local or synthetic source")
+        df = yf.download(
+            tickers=" ".join(tickers),
+            start=start,
+            end=end,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=False,
+            threads=True,
+            progress=False,
+        )
+        return df if not df.empty else None
+
+def fetch_yahoo_batch(
     tickers: List[str],
     start: str,
     end: str,
     interval: str = "1d",
 ) -> Optional[pd.DataFrame]:
-    for attempt in range(MAX_RETRIES):
-        try:
-            df = yf.download(
-                tickers=" ".join(tickers),
-                start=start,
-                end=end,
-                interval=interval,
-                group_by="ticker",
-                auto_adjust=False,
-                threads=True,
-                progress=False,
-            )
-            if not df.empty:
-                return df
-            else:
-                return None
-        except Exception as e:
-            print(f"[DEBUG] Exception during yfinance fetch: {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_BACKOFF * (2**attempt))
-            else:
-                return None
+    return YahooSource().fetch(tickers, start, end, interval)
 
-def get_existing_dates_for_ticker(ticker: str) -> set:
-    try:
-        raw_df = read_table("raw")
-        if "Date" not in raw_df.columns or f"{ticker}_Close" not in raw_df.columns:
-            return set()
-        # Use only dates where at least price data exists for ticker
-        return set(raw_df.loc[~raw_df[f"{ticker}_Close"].isna(), "Date"])
-    except Exception:
-        return set()
+def smart_append_raw(new_df) -> int:
+    # Keyed upsert on (Ticker, Date): revised bars replace the stored ones
+    return upsert_bars("raw", new_df)
 
-def smart_append_raw(new_df):
-    try:
-        old = read_table("raw")
-    except Exception:
-        old = None
-    if old is not None and not old.empty:
-        combined = pd.concat([old, new_df], ignore_index=True)
-        # "Date" + all ticker columns (since these are wide-form)
-        subset_cols = ["Date"] + [col for col in new_df.columns if col != "Date"]
-        combined = combined.drop_duplicates(subset=subset_cols, keep="last")
-    else:
-        combined = new_df
-    write_table(combined, "raw")
+def store_raw_batch(df: pd.DataFrame) -> int:
+    # Long frames (local / synthetic sources) go in as they are
+    if "Ticker" in df.columns:
+        return smart_append_raw(df)
+    return smart_append_raw(flatten_columns(df.reset_index()))
 
 def ingest_yahoo(
     tickers: List[str],
@@ -67,42 +56,68 @@ def ingest_yahoo(
     end: str,
     interval: str = "1d",
     raw_dir=None,
+    source: Optional[FetchFn] = None,
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = MAX_WORKERS,
+    force: bool = False,
 ) -> Dict[str, Any]:
-    to_download = []
-    # Check existing data for each ticker, only download missing dates
-    for ticker in tickers:
-        have_dates = get_existing_dates_for_ticker(ticker)
-        # If no dates, or new date range, add to download
-        if not have_dates:
-            to_download.append(ticker)
-        else:
-            # If at least one date is missing in requested range, add to download
-            req_dates = pd.date_range(start, end).strftime("%Y-%m-%d")
-            if not set(req_dates).issubset(have_dates):
-                to_download.append(ticker)
-    if not to_download:
+    """
+    Download only the sessions missing from 'raw' in [start, end) (`end`
+    exclusive, as Yahoo takes it): the gap planner turns the trading
+    calendar and the stored dates into per-range requests, which are
+    fetched in concurrent, rate-limited batches and upserted as they
+    arrive. `source` is any DataSource (Yahoo by default) or a bare fetch
+    function with fetch_yahoo_batch's signature; sources without a
+    `rate_limit` are not throttled. `force` forgets the sessions recorded as
+    unavailable for `tickers` and requests them again.
+    """
+    source = source or YahooSource()
+    if force:
+        clear_unavailable(tickers)
+    if interval == "1d":
+        ranges = plan_gaps(tickers, start, end)
+    else:
+        # The calendar only knows daily sessions
+        ranges = [(list(tickers), start, end)]
+    if not ranges:
         return {"success": True, "tickers": [], "row_count": 0, "msg": "All tickers/dates already present"}
-    df = fetch_yahoo_data(to_download, start, end, interval)
-    if df is not None and not df.empty:
-        df = df.reset_index()
-        df = flatten_columns(df)
-        smart_append_raw(df)
-        min_date = str(df["Date"].min()) if "Date" in df.columns else None
-        max_date = str(df["Date"].max()) if "Date" in df.columns else None
-        summary = {
-            "success": True,
-            "tickers": to_download,
-            "row_count": int(len(df)),
-            "start_date": min_date,
-            "end_date": max_date,
-        }
-        print(f"[INFO] Data written to DuckDB 'raw' table (smart append): {summary}")
+    scheduler = IngestionScheduler(
+        source,
+        store_raw_batch,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        rate=getattr(source, "rate_limit", REQUESTS_PER_SECOND),
+    )
+    summary = scheduler.run_plan(ranges, interval)
+    summary["ranges"] = [{"tickers": len(group), "start": s, "end": e} for group, s, e in ranges]
+    if interval == "1d":
+        # Holes inside an answer that had rows are not planned again
+        summary["unavailable"] = record_unavailable([r for r in summary["returned"] if r[0]])
+    summary.pop("returned", None)
+    if summary["tickers"]:
+        print(f"[INFO] Data upserted into DuckDB 'raw' table: {summary}")
         return summary
-    else:
-        error_msg = "No new data downloaded, all requested data already present or download failed."
-        print(f"[INFO] {error_msg}")
-        return {"success": False, "error": error_msg}
+    if not summary["failed"]:
+        return {"success": True, "tickers": [], "row_count": 0, "unavailable": summary.get("unavailable", 0), "msg": "Source returned no new data"}
+    error_msg = "No new data downloaded, all requested data already present or download failed."
+    print(f"[INFO] {error_msg}")
+    return {"success": False, "error": error_msg, "failed": summary["failed"]}
 
+def ingest_files(
+    path: str,
+    tickers: Optional[List[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    workers: int = READ_WORKERS,
+    root: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Bulk backfill from vendor CSV / Parquet dumps: every file under `path`
+    is read in parallel and upserted into 'raw' as soon as it is parsed,
+    without going through the per-request planner. With `root`, `path` must
+    resolve inside it.
+    """
+    return LocalFileSource(path, workers=workers, root=root).stream(store_raw_batch, tickers, start, end)
 
 if __name__ == "__main__":
     TICKERS = ["AAPL", "MSFT"]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from src.utils.data_hash import hash_dataframe, hash_series
+from src.utils.duckdb_helpers import read_frame
+
+KEY_COLUMNS = ("Date", "Ticker")
+
+class FeatureMatrix:
+    """
+    Training rows as NumPy arrays: `X` is one C-contiguous (rows, features)
+    block, so contiguous row ranges (walk-forward folds) slice as views.
+    """
+    def __init__(self, X: np.ndarray, y: np.ndarray, dates: np.ndarray, tickers: np.ndarray, feature_names: List[str]):
+        self.X = X
+        self.y = y
+        self.dates = dates
+        self.tickers = tickers
+        self.feature_names = feature_names
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def features_hash(self) -> str:
+        # Column-wise hash over a no-copy frame view of X
+        return hash_dataframe(pd.DataFrame(self.X, columns=self.feature_names, copy=False))
+
+    def target_hash(self) -> str:
+        return hash_series(pd.Series(self.y, copy=False))
+
+def column_array(table, name: str) -> np.ndarray:
+    # Zero-copy for single-chunk columns without nulls; nulls come back as NaN
+    column = table.column(name)
+    if column.num_chunks == 1:
+        column = column.chunk(0)
+    return column.to_numpy(zero_copy_only=False)
+
+def is_target_column(name: str, target_col: str) -> bool:
+    # The target and its per-date transforms (e.g. Return_1d_zscore) are labels
+    return name == target_col or name.startswith(f"{target_col}_")
+
+def fetch_feature_matrix(tickers: Optional[List[str]] = None, target_col: str = "Return_1d") -> FeatureMatrix:
+    """
+    Fetch features_tidy as Arrow with the ticker and target filters pushed
+    into DuckDB, then copy the feature columns once into a single matrix.
+    """
+    table = read_frame("features_tidy", tickers=tickers, not_null=[target_col], arrow=True)
+    names = [c for c in table.column_names if c not in KEY_COLUMNS and not is_target_column(c, target_col)]
+    columns = {name: column_array(table, name) for name in names}
+    dtype = np.result_type(*columns.values()) if columns else np.float64
+    X = np.empty((table.num_rows, len(names)), dtype=dtype)
+    for j, name in enumerate(names):
+        X[:, j] = columns.pop(name)
+    y = column_array(table, target_col)
+    dates = column_array(table, "Date")
+    ticker_values = table.column("Ticker").to_pandas().astype(str).to_numpy()
+    return FeatureMatrix(X, y, dates, ticker_values, names)
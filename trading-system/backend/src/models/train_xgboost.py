@@ -1,19 +1,19 @@
 import os
-import duckdb
 import pandas as pd
 import xgboost as xgb
 import joblib
 import json
 from datetime import datetime
 from typing import Dict
+from src.utils.duckdb_helpers import get_con
+from src.models.feature_matrix import is_target_column
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/database.duckdb"))
 MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../models/artifacts"))
 REGISTRY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../models/registry.json"))
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 def fetch_features(ticker: str, target_col: str) -> pd.DataFrame:
-    with duckdb.connect(DB_PATH) as con:
+    with get_con() as con:
         df = con.execute(f"SELECT * FROM features").fetchdf()
     needed = [c for c in df.columns if c.startswith(f"{ticker}_")] + ["Date"]
     needed = list(sorted(set(needed)))
@@ -23,7 +23,7 @@ def fetch_features(ticker: str, target_col: str) -> pd.DataFrame:
 
 def prep_data(df: pd.DataFrame, ticker: str, target_col: str):
     y = df[f"{ticker}_{target_col}"]
-    X = df.drop(columns=["Date", f"{ticker}_{target_col}"])
+    X = df.drop(columns=["Date"] + [c for c in df.columns if is_target_column(c, f"{ticker}_{target_col}")])
     cutoff = int(len(X) * 0.8)
     X_train, X_val = X.iloc[:cutoff], X.iloc[cutoff:]
     y_train, y_val = y.iloc[:cutoff], y.iloc[cutoff:]
@@ -1,5 +1,4 @@
 import os
-import duckdb
 import pandas as pd
 import numpy as np
 import joblib
@@ -7,11 +6,12 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from src.utils.json_safe import clean_for_json
-from src.utils.duckdb_helpers import append_table
-from src.utils.data_hash import hash_dataframe, hash_series
+from src.utils.duckdb_helpers import read_frame
+from src.utils.prediction_store import replace_predictions
+from src.utils.partition_digests import dataset_hash
+from src.models.feature_matrix import FeatureMatrix, fetch_feature_matrix
 from src.utils.metrics import rmse, sharpe_ratio, max_drawdown
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/database.duckdb"))
 MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../models/artifacts"))
 REGISTRY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../models/registry.json"))
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -68,12 +68,13 @@ class ModelTrainer:
         self.registry_meta = None
 
     def fetch_features(self) -> pd.DataFrame:
-        with duckdb.connect(DB_PATH) as con:
-            df = con.execute(f"SELECT * FROM features_tidy").fetchdf()
-        if self.tickers:
-            df = df[df["Ticker"].isin(self.tickers)]
-        df = df.dropna(subset=[self.target_col])
-        return df
+        # Ticker and target filters run in DuckDB. Compact tables load as
+        # float32 / categorical Ticker; keep those dtypes
+        return read_frame("features_tidy", tickers=self.tickers, not_null=[self.target_col])
+
+    def fetch_matrix(self) -> FeatureMatrix:
+        # Arrow fetch, one copy into a contiguous matrix; folds below are views of it
+        return fetch_feature_matrix(self.tickers, self.target_col)
 
     def get_model(self, params: Dict[str, Any]):
         params = dict(params, random_state=self.seed)
@@ -94,9 +95,9 @@ class ModelTrainer:
             fold_imports = []
             for fold in folds:
                 model = self.get_model(cfg)
-                X_train, y_train = X.iloc[fold["train"]], y.iloc[fold["train"]]
-                X_val, y_val = X.iloc[fold["val"]], y.iloc[fold["val"]]
-                X_test, y_test = X.iloc[fold["test"]], y.iloc[fold["test"]]
+                X_train, y_train = X[fold["train"]], y[fold["train"]]
+                X_val, y_val = X[fold["val"]], y[fold["val"]]
+                X_test, y_test = X[fold["test"]], y[fold["test"]]
                 # Safe fit for early_stopping_rounds depending on version
                 try:
                     model.fit(
@@ -166,32 +167,27 @@ class ModelTrainer:
         with open(REGISTRY_PATH, "w") as f:
             json.dump(reg, f, indent=2)
 
-    def write_predictions(self):
-        df = self.fetch_features()
-        if df.empty or self.model is None or self.registry_meta is None:
+    def write_predictions(self, matrix: Optional[FeatureMatrix] = None):
+        matrix = matrix if matrix is not None else self.fetch_matrix()
+        if len(matrix) == 0 or self.model is None or self.registry_meta is None:
             return
-        with duckdb.connect(DB_PATH) as con:
-            con.execute("DELETE FROM predictions WHERE model_id = ?", [self.registry_meta["model_id"]])
-        X_pred = df.drop(columns=["Date", "Ticker", self.target_col])
-        preds = self.model.predict(X_pred)
+        preds = self.model.predict(matrix.X)
         out_df = pd.DataFrame({
             "model_id": self.registry_meta["model_id"],
-            "Date": df["Date"],
-            "Ticker": df["Ticker"],
+            "Date": matrix.dates,
+            "Ticker": matrix.tickers,
             "Prediction": preds,
-            "Return_1d": df[self.target_col],
+            "Return_1d": matrix.y,
         })
-        append_table(out_df, "predictions")
+        # Readers see either the old or the new predictions for this model
+        replace_predictions(self.registry_meta["model_id"], out_df)
 
     def run(self):
-        df = self.fetch_features()
-        if df.empty:
+        matrix = self.fetch_matrix()
+        if len(matrix) == 0:
             raise ValueError("No features found for training")
-        y = df[self.target_col]
-        X = df.drop(columns=["Date", "Ticker", self.target_col])
-        dates = df["Date"]
-        self.feature_names = list(X.columns)
-        cv_results, best_model, best_params, best_metrics = self.rolling_cv_metrics(X, y, dates)
+        self.feature_names = matrix.feature_names
+        cv_results, best_model, best_params, best_metrics = self.rolling_cv_metrics(matrix.X, matrix.y, matrix.dates)
         self.model = best_model
         self.model_params = best_params
 
@@ -200,9 +196,11 @@ class ModelTrainer:
         test_rmses = [m.get("test_rmse", 0) for m in best_metrics]
         test_drawdowns = [m.get("test_drawdown", 0) for m in best_metrics]
 
+        # From the stored partition digests: no second pass over the matrix,
+        # and the same values /api/data/latest-hash reports
         hash_dict = {
-            "features_hash_train": hash_dataframe(X),
-            "target_hash_train": hash_series(y)
+            "features_hash_train": dataset_hash("features_tidy", self.tickers, self.feature_names)["hash"],
+            "target_hash_train": dataset_hash("features_tidy", self.tickers, [self.target_col])["hash"]
         }
         ts = datetime.now().isoformat()
         meta = {
@@ -221,7 +219,7 @@ class ModelTrainer:
         meta = self.save_artifacts(meta)
         self.registry_meta = clean_for_json(meta)
         self.update_registry()
-        self.write_predictions()
+        self.write_predictions(matrix)
         return meta
 
 if __name__ == "__main__":
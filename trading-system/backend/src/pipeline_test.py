@@ -1,7 +1,10 @@
 from src.utils.duckdb_helpers import read_table, write_table
+from src.utils.bar_storage import write_bars
 from src.ingestion.yahoo_ingest import ingest_yahoo
-from src.validation.validate_data import run_full_validation, basic_cleaning
-from src.features.feature_engineering import compute_all_ticker_features
+from src.validation.validate_data import validate_bars, basic_cleaning
+from src.features.feature_engineering import compute_all_ticker_features, compute_all_ticker_features_tidy
+from src.features.cross_sectional import add_cross_sectional_features
+from src.models.feature_matrix import fetch_feature_matrix, is_target_column
 
 TICKERS = ["AAPL", "MSFT"]
 START = "2023-01-01"
@@ -17,10 +20,10 @@ if df is None or df.empty:
 print("[OK] Data ingested to DuckDB table 'raw'.")
 
 print("Step 2: Validate & Clean")
-results = run_full_validation(df, [], [])
+results = validate_bars("raw")
 print("[OK] Validation results:", results)
 cleaned_df = basic_cleaning(df)
-write_table(cleaned_df, "cleaned")
+write_bars("cleaned", cleaned_df)
 print("[OK] Cleaned data saved to DuckDB table 'cleaned'.")
 
 print("Step 3: Feature Engineering")
@@ -30,4 +33,13 @@ features_df = compute_all_ticker_features(cleaned_df)
 write_table(features_df, "features")
 print("[OK] Features data saved to DuckDB table 'features'.")
 
+print("Step 4: Training matrix")
+write_table(add_cross_sectional_features(compute_all_ticker_features_tidy(cleaned_df)), "features_tidy")
+matrix = fetch_feature_matrix(TICKERS, "Return_1d")
+leaked = [c for c in matrix.feature_names if is_target_column(c, "Return_1d")]
+if leaked:
+    print("[FAIL] Target-derived columns in the training features:", leaked)
+    exit(1)
+print(f"[OK] {len(matrix.feature_names)} training features, none derived from the target.")
+
 print("\nPipeline run completed successfully!")
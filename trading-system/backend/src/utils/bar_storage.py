@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional
+from src.utils.pandas_helpers import SOURCE_FIELDS, flatten_columns, split_wide_column
+from src.utils.partition_digests import update_digests
+from src.utils.coverage import update_coverage
+from src.utils.duckdb_helpers import (
+    get_con, run_write, relation_type, create_pivot_view, drop_relation, quote_ident, read_frame,
+)
+
+BAR_FIELDS = list(SOURCE_FIELDS)
+
+# Wide name (now a compatibility view) -> long storage table
+BAR_TABLES = {"raw": "raw_bars", "cleaned": "cleaned_bars"}
+
+def bars_table(name: str) -> str:
+    return BAR_TABLES[name]
+
+def bars_ddl(table: str) -> str:
+    fields = ", ".join(f"{quote_ident(f)} DOUBLE" for f in BAR_FIELDS)
+    return f"CREATE TABLE IF NOT EXISTS {table} (Date TIMESTAMP, Ticker VARCHAR, {fields}, PRIMARY KEY (Ticker, Date))"
+
+def wide_to_long(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    `{ticker}_{field}` columns to (Date, Ticker, fields...) rows sorted by
+    (Ticker, Date). Dates where a ticker has no values at all are dropped.
+    """
+    df = flatten_columns(df)
+    dates = pd.to_datetime(df["Date"]).to_numpy()
+    by_ticker = {}
+    for col in df.columns:
+        parsed = split_wide_column(col)
+        if parsed is not None:
+            by_ticker.setdefault(parsed[0], {})[parsed[1]] = col
+    frames = []
+    for ticker in sorted(by_ticker):
+        cols = by_ticker[ticker]
+        values = np.full((len(df), len(BAR_FIELDS)), np.nan)
+        for j, field in enumerate(BAR_FIELDS):
+            if field in cols:
+                values[:, j] = pd.to_numeric(df[cols[field]], errors="coerce").to_numpy(dtype=np.float64)
+        keep = ~np.isnan(values).all(axis=1)
+        frame = pd.DataFrame(values[keep], columns=BAR_FIELDS)
+        frame.insert(0, "Ticker", ticker)
+        frame.insert(0, "Date", dates[keep])
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["Date", "Ticker"] + BAR_FIELDS)
+    return pd.concat(frames, ignore_index=True)
+
+def bar_tickers(name: str) -> List[str]:
+    with get_con() as con:
+        return [r[0] for r in con.execute(f"SELECT DISTINCT Ticker FROM {bars_table(name)} ORDER BY Ticker").fetchall()]
+
+def refresh_wide_view(name: str) -> None:
+    tickers = bar_tickers(name)
+    if tickers:
+        create_pivot_view(name, bars_table(name), BAR_FIELDS, tickers)
+    else:
+        run_write(lambda con: drop_relation(con, name))
+
+def migrate_wide_table(name: str) -> bool:
+    """
+    Move a legacy wide `raw`/`cleaned` table into its long table and replace
+    it with the compatibility view. Returns False if there was nothing to migrate.
+    """
+    with get_con() as con:
+        if relation_type(con, name) != "BASE TABLE":
+            return False
+        wide = con.execute(f"SELECT * FROM {name}").df()
+        con.execute(bars_ddl(bars_table(name)))
+    write_bars(name, wide)
+    print(f"[INFO] Migrated wide table '{name}' to '{bars_table(name)}' ({len(wide)} dates)")
+    return True
+
+def ensure_bars_table(name: str) -> str:
+    table = bars_table(name)
+    with get_con() as con:
+        exists = relation_type(con, table) is not None
+        legacy = relation_type(con, name) == "BASE TABLE"
+    if legacy:
+        migrate_wide_table(name)
+    elif not exists:
+        run_write(lambda con: con.execute(bars_ddl(table)))
+    return table
+
+def write_bars(name: str, df: pd.DataFrame) -> int:
+    """
+    Replace the contents of a long bar table with `df` (wide or long) and
+    refresh its wide view. Rows are stored in (Ticker, Date) order so DuckDB's
+    zone maps can skip row groups on ticker filters.
+    """
+    table = bars_table(name)
+    long = df if "Ticker" in df.columns else wide_to_long(df)
+    cols = ", ".join(quote_ident(c) for c in ["Date", "Ticker"] + BAR_FIELDS)
+
+    def replace(con):
+        con.register("long_bars", long)
+        try:
+            con.execute(bars_ddl(table))
+            con.execute("BEGIN TRANSACTION")
+            con.execute(f"DELETE FROM {table}")
+            con.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM long_bars ORDER BY Ticker, Date")
+            update_coverage(con, table)
+            update_digests(con, table)
+            con.execute("COMMIT")
+        finally:
+            con.unregister("long_bars")
+    run_write(replace)
+    refresh_wide_view(name)
+    return len(long)
+
+def upsert_bars(name: str, df: pd.DataFrame) -> int:
+    """
+    Insert or overwrite rows keyed on (Ticker, Date); only the delta is
+    written. The wide view is rebuilt only when new tickers appear.
+    """
+    table = ensure_bars_table(name)
+    long = df if "Ticker" in df.columns else wide_to_long(df)
+    # Within one batch the last row for a key wins, as in the old dedupe
+    long = long.drop_duplicates(subset=["Ticker", "Date"], keep="last")
+    if long.empty:
+        return 0
+    cols = ", ".join(quote_ident(c) for c in ["Date", "Ticker"] + BAR_FIELDS)
+    known = set(bar_tickers(name))
+    tickers = sorted(long["Ticker"].astype(str).unique())
+
+    def upsert(con):
+        con.register("long_bars", long)
+        try:
+            con.execute("BEGIN TRANSACTION")
+            con.execute(f"INSERT OR REPLACE INTO {table} ({cols}) SELECT {cols} FROM long_bars ORDER BY Ticker, Date")
+            update_coverage(con, table, tickers)
+            update_digests(con, table, tickers, long["Date"].min())
+            con.execute("COMMIT")
+        finally:
+            con.unregister("long_bars")
+    run_write(upsert)
+    if not set(long["Ticker"]).issubset(known):
+        refresh_wide_view(name)
+    return len(long)
+
+def read_bars(
+    name: str,
+    tickers: Optional[List[str]] = None,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    dropna: bool = False,
+) -> pd.DataFrame:
+    return read_frame(
+        ensure_bars_table(name), tickers=tickers, start=start, end=end,
+        limit=limit, offset=offset, dropna=dropna,
+    )
+
+def migrate_all() -> None:
+    for name in BAR_TABLES:
+        if not migrate_wide_table(name):
+            print(f"[INFO] '{name}' is already stored long")
+
+if __name__ == "__main__":
+    migrate_all()
@@ -0,0 +1,103 @@
+import sys
+import duckdb
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from src.utils.duckdb_helpers import get_con, relation_type, run_write
+from src.utils.trading_calendar import get_calendar
+
+COVERAGE_DDL = """
+CREATE TABLE IF NOT EXISTS coverage (
+    dataset VARCHAR,
+    Ticker VARCHAR,
+    first_date TIMESTAMP,
+    last_date TIMESTAMP,
+    row_count BIGINT,
+    gaps STRUCT(gap_start TIMESTAMP, gap_end TIMESTAMP)[],
+    updated_at TIMESTAMP
+);
+"""
+
+def update_coverage(con: duckdb.DuckDBPyConnection, table: str, tickers: Optional[List[str]] = None) -> None:
+    # Gaps are runs of exchange sessions with no bar; intraday bars count for their day
+    con.execute(COVERAGE_DDL)
+    where, params = ["Close IS NOT NULL"], []
+    scope = ""
+    if tickers:
+        in_list = ", ".join("?" for _ in tickers)
+        where.append(f"Ticker IN ({in_list})")
+        scope = f" AND Ticker IN ({in_list})"
+        params = [str(t) for t in tickers]
+    condition = " AND ".join(where)
+    con.execute(f"DELETE FROM coverage WHERE dataset = ?{scope}", [table] + params)
+    first, last = con.execute(f"SELECT min(Date), max(Date) FROM {table} WHERE {condition}", params).fetchone()
+    if first is None:
+        return
+    sessions = get_calendar().sessions(first, last)
+    con.register("coverage_sessions", pd.DataFrame({"session": sessions.to_numpy(), "idx": range(len(sessions))}))
+    try:
+        con.execute(
+            "INSERT INTO coverage "
+            "WITH bars AS ("
+            f"  SELECT Ticker, Date FROM {table} WHERE {condition}"
+            "), spans AS ("
+            "  SELECT Ticker, min(Date) AS first_date, max(Date) AS last_date, count(*) AS row_count FROM bars GROUP BY Ticker"
+            "), missing AS ("
+            "  SELECT s.Ticker, c.idx, c.session FROM spans s "
+            "  JOIN coverage_sessions c ON c.session BETWEEN date_trunc('day', s.first_date) AND s.last_date "
+            "  ANTI JOIN (SELECT DISTINCT Ticker, date_trunc('day', Date) AS day FROM bars) b "
+            "  ON b.Ticker = s.Ticker AND b.day = c.session"
+            "), runs AS ("
+            "  SELECT Ticker, min(session) AS gap_start, max(session) AS gap_end FROM ("
+            "    SELECT *, idx - row_number() OVER (PARTITION BY Ticker ORDER BY idx) AS run FROM missing"
+            "  ) GROUP BY Ticker, run"
+            ") "
+            "SELECT ?, s.Ticker, s.first_date, s.last_date, s.row_count, "
+            "coalesce(list({'gap_start': r.gap_start, 'gap_end': r.gap_end} ORDER BY r.gap_start) "
+            "FILTER (WHERE r.gap_start IS NOT NULL), []), now() "
+            "FROM spans s LEFT JOIN runs r ON r.Ticker = s.Ticker "
+            "GROUP BY s.Ticker, s.first_date, s.last_date, s.row_count ORDER BY s.Ticker",
+            params + [table],
+        )
+    finally:
+        con.unregister("coverage_sessions")
+
+def ensure_coverage(table: str) -> None:
+    # Builds the catalog for tables written before it existed
+    with get_con() as con:
+        if relation_type(con, table) is None:
+            return
+        built = relation_type(con, "coverage") is not None and con.execute(
+            "SELECT count(*) FROM coverage WHERE dataset = ?", [table]
+        ).fetchone()[0] > 0
+        empty = con.execute(f"SELECT count(*) FROM (SELECT 1 FROM {table} LIMIT 1)").fetchone()[0] == 0
+    if not built and not empty:
+        run_write(lambda con: update_coverage(con, table))
+
+def read_coverage(table: str, tickers: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    ensure_coverage(table)
+    query, params = "SELECT Ticker, first_date, last_date, row_count, gaps FROM coverage WHERE dataset = ?", [table]
+    if tickers:
+        query += f" AND Ticker IN ({', '.join('?' for _ in tickers)})"
+        params += [str(t) for t in tickers]
+    with get_con() as con:
+        if relation_type(con, "coverage") is None:
+            return {}
+        rows = con.execute(query + " ORDER BY Ticker", params).fetchall()
+    return {
+        ticker: {
+            "start_date": str(first),
+            "end_date": str(last),
+            "row_count": int(count),
+            "gaps": [[str(g["gap_start"]), str(g["gap_end"])] for g in gaps or []],
+        }
+        for ticker, first, last, count, gaps in rows
+    }
+
+if __name__ == "__main__":
+    # python -m src.utils.coverage [table ...]; rebuilds the catalog
+    for name in sys.argv[1:] or ["raw_bars", "cleaned_bars"]:
+        with get_con() as con:
+            exists = relation_type(con, name) is not None
+        if exists:
+            run_write(lambda con: update_coverage(con, name))
+            print(f"[INFO] {name}: {len(read_coverage(name))} tickers")
@@ -1,39 +1,325 @@
 import os
+import json
+import atexit
+import threading
 import duckdb
 import pandas as pd
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+from src.utils.write_queue import WriteQueue
 
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/database.duckdb"))
 
-def get_con() -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(DB_PATH)
+# Tables stored with the compact profile: DATE dates, ENUM tickers, FLOAT values
+COMPACT_TABLES = {"features", "features_tidy"}
+COMPACT_STORAGE = os.environ.get("POLARIS_COMPACT_STORAGE", "1") == "1"
 
-def write_table(df: pd.DataFrame, table: str, mode: str = "overwrite") -> None:
-    with get_con() as con:
-        if mode == "overwrite":
-            con.execute(f"DROP TABLE IF EXISTS {table}")
-        con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM df")
+PARQUET_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/parquet"))
+# "duckdb": read_frame reads the database file; "parquet": it scans exported datasets where present
+READ_SOURCE = os.environ.get("POLARIS_READ_SOURCE", "duckdb")
+# Exported dataset -> the database table it mirrors
+PARQUET_DATASETS = {"raw": "raw_bars", "cleaned": "cleaned_bars", "features_tidy": "features_tidy", "predictions": "predictions"}
+PARTITION_COLUMN = "year"
+
+# Unset means DuckDB's defaults (80% of RAM, one thread per core)
+DB_MEMORY_LIMIT = os.environ.get("POLARIS_DUCKDB_MEMORY_LIMIT")
+DB_THREADS = os.environ.get("POLARIS_DUCKDB_THREADS")
+
+# "1": writes go through one writer thread (see write_queue); "0": callers write directly
+WRITE_QUEUE = os.environ.get("POLARIS_WRITE_QUEUE", "1") == "1"
+
+class ConnectionManager:
+    """
+    One long-lived connection per database file. Callers get cursors, which
+    are cheap and share the database instance (and its buffer cache); each
+    cursor should stay on the thread that created it.
+    """
+    def __init__(self, path: str, memory_limit: Optional[str] = None, threads: Optional[int] = None):
+        self.path = path
+        self.memory_limit = memory_limit
+        self.threads = threads
+        self._con: Optional[duckdb.DuckDBPyConnection] = None
+        self._lock = threading.Lock()
+
+    def config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = {}
+        if self.memory_limit:
+            config["memory_limit"] = self.memory_limit
+        if self.threads:
+            config["threads"] = int(self.threads)
+        return config
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            if self._con is None:
+                self._con = duckdb.connect(self.path, config=self.config())
+            return self._con.cursor()
+
+    def configure(self, memory_limit: Optional[str] = None, threads: Optional[int] = None) -> None:
+        with self._lock:
+            if memory_limit:
+                self.memory_limit = memory_limit
+                if self._con is not None:
+                    self._con.execute(f"SET memory_limit = '{memory_limit}'")
+            if threads:
+                self.threads = int(threads)
+                if self._con is not None:
+                    self._con.execute(f"SET threads = {int(threads)}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+# One manager per database file: repointing DB_PATH never closes cursors
+# other threads still hold on the previous file
+_managers: Dict[str, ConnectionManager] = {}
+_manager_lock = threading.Lock()
+
+def get_manager(path: Optional[str] = None) -> ConnectionManager:
+    path = os.path.abspath(path or DB_PATH)
+    with _manager_lock:
+        if path not in _managers:
+            _managers[path] = ConnectionManager(path, DB_MEMORY_LIMIT, DB_THREADS)
+        return _managers[path]
+
+def get_con(path: Optional[str] = None) -> duckdb.DuckDBPyConnection:
+    # A cursor on the shared connection; closing it leaves the database open
+    return get_manager(path).cursor()
+
+def close_connections() -> None:
+    with _manager_lock:
+        for manager in _managers.values():
+            manager.close()
+
+atexit.register(close_connections)
+
+_writer: Optional[WriteQueue] = None
+
+def get_writer() -> WriteQueue:
+    global _writer
+    with _manager_lock:
+        if _writer is None:
+            _writer = WriteQueue(get_con, on_insert=table_written)
+            # Registered after close_connections, so it runs first and drains pending writes
+            atexit.register(_writer.stop)
+        return _writer
+
+def direct_write() -> bool:
+    return not WRITE_QUEUE or get_writer().in_writer()
+
+def run_write(fn: Callable[[duckdb.DuckDBPyConnection], Any]) -> Any:
+    """
+    Run `fn(con)` on the writer thread and wait for its result. Jobs from
+    all threads run one at a time, in submission order; exceptions raised by
+    `fn` are re-raised here.
+    """
+    if direct_write():
+        with get_con() as con:
+            return fn(con)
+    return get_writer().submit(fn).result()
+
+def relation_type(con: duckdb.DuckDBPyConnection, name: str) -> Optional[str]:
+    # 'BASE TABLE', 'VIEW' or None
+    row = con.execute(
+        "SELECT table_type FROM information_schema.tables WHERE lower(table_name) = lower(?)", [name]
+    ).fetchone()
+    return row[0] if row else None
+
+def drop_relation(con: duckdb.DuckDBPyConnection, name: str) -> None:
+    kind = relation_type(con, name)
+    if kind == "VIEW":
+        con.execute(f"DROP VIEW {name}")
+    elif kind is not None:
+        con.execute(f"DROP TABLE {name}")
 
-def append_table(df: pd.DataFrame, table: str) -> None:
+def is_view(name: str) -> bool:
     with get_con() as con:
-        con.execute(f"INSERT INTO {table} SELECT * FROM df")
+        return relation_type(con, name) == "VIEW"
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def create_pivot_view(view: str, source: str, value_columns: List[str], tickers: List[str]) -> None:
+    """
+    Wide `{ticker}_{column}` view over a long (Date, Ticker, ...) table. The
+    ticker list is explicit because DuckDB views can't hold a dynamic PIVOT.
+    """
+    in_list = ", ".join("'" + t.replace("'", "''") + "'" for t in tickers)
+    using = ", ".join(f"first({quote_ident(c)}) AS {quote_ident(c)}" for c in value_columns)
+
+    def create(con):
+        if relation_type(con, view) == "BASE TABLE":
+            con.execute(f"DROP TABLE {view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {view} AS "
+            f"PIVOT {source} ON Ticker IN ({in_list}) USING {using} GROUP BY Date ORDER BY Date"
+        )
+    run_write(create)
+
+def compact_select(df: pd.DataFrame) -> str:
+    # Keys first, then the float columns in their original (grouped) order
+    keys, floats, other = [], [], []
+    for col in df.columns:
+        q = quote_ident(col)
+        if col == "Date":
+            keys.insert(0, f"CAST({q} AS DATE) AS {q}")
+        elif col == "Ticker":
+            values = ", ".join("'" + v.replace("'", "''") + "'" for v in sorted(df[col].dropna().astype(str).unique()))
+            keys.append(f"CAST({q} AS ENUM({values})) AS {q}")
+        elif pd.api.types.is_float_dtype(df[col]):
+            floats.append(f"CAST({q} AS FLOAT) AS {q}")
+        else:
+            other.append(q)
+    return ", ".join(keys + floats + other)
+
+def table_written(con: duckdb.DuckDBPyConnection, table: str, frame: Optional[pd.DataFrame] = None) -> None:
+    # Runs inside the write's transaction so derived digests cannot go stale
+    from src.utils.partition_digests import update_frame_digests
+    update_frame_digests(con, table, frame)
+
+def write_table(df: pd.DataFrame, table: str, mode: str = "overwrite", compact: Optional[bool] = None) -> None:
+    if compact is None:
+        compact = COMPACT_STORAGE and table in COMPACT_TABLES
+    select = compact_select(df) if compact else "*"
+
+    def write(con):
+        # Registered by name: the frame is not a local of the writer thread's frame
+        con.register("write_frame", df)
+        try:
+            con.execute("BEGIN TRANSACTION")
+            if mode == "overwrite":
+                drop_relation(con, table)
+            con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT {select} FROM write_frame")
+            table_written(con, table)
+            con.execute("COMMIT")
+        finally:
+            con.unregister("write_frame")
+    run_write(write)
+
+def append_table(df: pd.DataFrame, table: str, wait: bool = True) -> Union[int, Future]:
+    # Appends queued together for the same table are written in one transaction
+    if direct_write():
+        with get_con() as con:
+            con.execute("BEGIN TRANSACTION")
+            con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM df")
+            table_written(con, table, df)
+            con.execute("COMMIT")
+        return len(df)
+    future = get_writer().insert(table, df)
+    return future.result() if wait else future
 
 def read_table(table: str) -> pd.DataFrame:
     with get_con() as con:
         return con.execute(f"SELECT * FROM {table}").df()
 
-def run_query(query: str) -> pd.DataFrame:
+def parquet_scan(dataset: str, directory: Optional[str] = None) -> str:
+    path = os.path.join(directory or PARQUET_DIR, dataset, "**", "*.parquet").replace("'", "''")
+    return (
+        f"read_parquet('{path}', hive_partitioning = true, "
+        f"hive_types = {{'Ticker': VARCHAR, '{PARTITION_COLUMN}': INTEGER}})"
+    )
+
+def parquet_source(table: str) -> Optional[str]:
+    """
+    Subquery over the Hive-partitioned export of `table` (Ticker=/year=
+    directories), with the table's original column order; None when
+    reading from the database file.
+    """
+    if READ_SOURCE != "parquet":
+        return None
+    dataset = next((d for d, t in PARQUET_DATASETS.items() if t == table), None)
+    if dataset is None:
+        return None
+    schema_path = os.path.join(PARQUET_DIR, dataset, "_columns.json")
+    if not os.path.exists(schema_path):
+        return None
+    with open(schema_path) as f:
+        columns = json.load(f)
+    cols = ", ".join(quote_ident(c) for c in columns + [PARTITION_COLUMN])
+    return f"(SELECT {cols} FROM {parquet_scan(dataset)})"
+
+def table_columns(table: str) -> List[str]:
+    source = parquet_source(table)
     with get_con() as con:
-        return con.execute(query).df()
+        cols = [d[0] for d in con.execute(f"SELECT * FROM {source or table} LIMIT 0").description]
+    return [c for c in cols if c != PARTITION_COLUMN] if source else cols
 
-def ensure_predictions_table():
-    ddl = """
-    CREATE TABLE IF NOT EXISTS predictions (
-        model_id VARCHAR,
-        Date VARCHAR,
-        Ticker VARCHAR,
-        Prediction DOUBLE,
-        Return_1d DOUBLE
-    );
+def read_frame(
+    table: str,
+    columns: Optional[List[str]] = None,
+    tickers: Optional[List[str]] = None,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    dropna: bool = False,
+    not_null: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    arrow: bool = False,
+):
+    """
+    Read with projection and filters pushed into DuckDB. `tickers` filters
+    rows of long (Ticker-column) tables and selects `{ticker}_*` columns of
+    wide ones. `dropna` drops rows with a NULL in any selected column and
+    `filters` are column == value conditions. In parquet read mode the
+    Ticker and date filters also prune partitions.
+    Returns a DataFrame, or a pyarrow Table when `arrow` is set.
     """
+    source = parquet_source(table)
+    available = table_columns(table)
+    long_format = "Ticker" in available
+    if columns is None:
+        columns = available
+        if tickers and not long_format:
+            prefixes = tuple(f"{t}_" for t in tickers)
+            columns = [c for c in available if c == "Date" or c.startswith(prefixes)]
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise KeyError(f"Columns not in '{table}': {missing}")
+
+    where, params = [], []
+    if tickers and long_format:
+        # Literal IN list rather than unnest(?) so Parquet partitions can be pruned
+        where.append(f"Ticker IN ({', '.join('?' for _ in tickers)})")
+        params += [str(t) for t in tickers]
+    if start is not None:
+        where.append("Date >= ?")
+        params.append(start)
+        if source:
+            where.append(f"{PARTITION_COLUMN} >= ?")
+            params.append(pd.Timestamp(start).year)
+    if end is not None:
+        where.append("Date <= ?")
+        params.append(end)
+        if source:
+            where.append(f"{PARTITION_COLUMN} <= ?")
+            params.append(pd.Timestamp(end).year)
+    for col, value in (filters or {}).items():
+        where.append(f"{quote_ident(col)} = ?")
+        params.append(value)
+    required = list(not_null or [])
+    if dropna:
+        required += [c for c in columns if c not in required]
+    where += [f"{quote_ident(c)} IS NOT NULL" for c in required]
+
+    query = f"SELECT {', '.join(quote_ident(c) for c in columns)} FROM {source or table}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    order = [c for c in ("Date", "Ticker") if c in available]
+    if order:
+        query += " ORDER BY " + ", ".join(order)
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    if offset is not None:
+        query += f" OFFSET {int(offset)}"
     with get_con() as con:
-        con.execute(ddl)
+        result = con.execute(query, params)
+        if arrow:
+            return result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+        return result.df()
+
+def run_query(query: str) -> pd.DataFrame:
+    with get_con() as con:
+        return con.execute(query).df()
@@ -1,4 +1,15 @@
 import pandas as pd
+from typing import Optional, Tuple
+
+# OHLCV fields of a bar, the suffixes of wide `{ticker}_{field}` columns
+SOURCE_FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+
+def split_wide_column(col: str) -> Optional[Tuple[str, str]]:
+    # Match on the known field suffix so tickers containing "_" survive
+    for field in SOURCE_FIELDS:
+        if col.endswith(f"_{field}"):
+            return col[:-len(field) - 1], field
+    return None
 
 def flatten_columns(df):
     # Handles MultiIndex, tuple columns, and also stringified-tuple columns
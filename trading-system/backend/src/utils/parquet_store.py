@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import shutil
+from typing import Dict, List, Optional
+from src.utils.duckdb_helpers import (
+    COMPACT_STORAGE, PARQUET_DATASETS, PARQUET_DIR, PARTITION_COLUMN,
+    get_con, parquet_scan, quote_ident, relation_type, run_write, table_written,
+)
+from src.utils.bar_storage import BAR_TABLES, ensure_bars_table, refresh_wide_view
+from src.utils.prediction_store import cluster_predictions, ensure_predictions_table
+from src.utils.coverage import update_coverage
+
+SCHEMA_FILE = "_columns.json"
+
+def export_parquet(datasets: Optional[List[str]] = None, directory: str = PARQUET_DIR) -> Dict[str, int]:
+    """
+    Write each dataset as Hive-partitioned Parquet under
+    `{directory}/{dataset}/Ticker=.../year=.../`. A dataset is written to a
+    staging directory and swapped in, so readers never see a partial export.
+    """
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for dataset in datasets or list(PARQUET_DATASETS):
+        table = PARQUET_DATASETS[dataset]
+        if dataset in BAR_TABLES:
+            ensure_bars_table(dataset)
+        target = os.path.join(directory, dataset)
+        staging = target + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        with get_con() as con:
+            if relation_type(con, table) is None:
+                print(f"[INFO] Skipping '{dataset}': table '{table}' does not exist")
+                continue
+            columns = [d[0] for d in con.execute(f"SELECT * FROM {table} LIMIT 0").description]
+            con.execute(
+                f"COPY (SELECT *, year(CAST(Date AS TIMESTAMP)) AS {PARTITION_COLUMN} FROM {table} ORDER BY Ticker, Date) "
+                f"TO '{staging}' (FORMAT parquet, PARTITION_BY (Ticker, {PARTITION_COLUMN}))"
+            )
+            counts[dataset] = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        os.makedirs(staging, exist_ok=True)
+        # Partition columns move into the path; keep the table's column order
+        with open(os.path.join(staging, SCHEMA_FILE), "w") as f:
+            json.dump(columns, f)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        print(f"[INFO] Exported {counts[dataset]} rows of '{table}' to {target}")
+    return counts
+
+def import_parquet(datasets: Optional[List[str]] = None, directory: str = PARQUET_DIR) -> Dict[str, int]:
+    # Replace the database tables with the contents of an export
+    counts = {}
+    for dataset in datasets or list(PARQUET_DATASETS):
+        table = PARQUET_DATASETS[dataset]
+        schema_path = os.path.join(directory, dataset, SCHEMA_FILE)
+        if not os.path.exists(schema_path):
+            print(f"[INFO] Skipping '{dataset}': no export in {directory}")
+            continue
+        with open(schema_path) as f:
+            columns = json.load(f)
+        scan = parquet_scan(dataset, directory)
+        cols = ", ".join(quote_ident(c) for c in columns)
+        if dataset in BAR_TABLES or table == "predictions":
+            if dataset in BAR_TABLES:
+                ensure_bars_table(dataset)
+            else:
+                ensure_predictions_table()
+
+            def replace(con):
+                con.execute("BEGIN TRANSACTION")
+                con.execute(f"DELETE FROM {table}")
+                con.execute(f"INSERT INTO {table} BY NAME SELECT {cols} FROM {scan} ORDER BY Ticker, Date")
+                if dataset in BAR_TABLES:
+                    update_coverage(con, table)
+                table_written(con, table)
+                con.execute("COMMIT")
+                if table == "predictions":
+                    # Fresh model keys and per-model stats for the imported rows
+                    cluster_predictions(con)
+            run_write(replace)
+            if dataset in BAR_TABLES:
+                refresh_wide_view(dataset)
+        else:
+            with get_con() as con:
+                select = cols
+                if COMPACT_STORAGE and "Ticker" in columns:
+                    tickers = [r[0] for r in con.execute(f"SELECT DISTINCT Ticker FROM {scan} ORDER BY 1").fetchall()]
+                    values = ", ".join("'" + t.replace("'", "''") + "'" for t in tickers)
+                    select = ", ".join(
+                        f"CAST(Ticker AS ENUM({values})) AS Ticker" if c == "Ticker" else quote_ident(c) for c in columns
+                    )
+
+            def create(con):
+                con.execute("BEGIN TRANSACTION")
+                con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT {select} FROM {scan} ORDER BY Date, Ticker")
+                table_written(con, table)
+                con.execute("COMMIT")
+            run_write(create)
+        with get_con() as con:
+            counts[dataset] = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        print(f"[INFO] Imported {counts[dataset]} rows into '{table}'")
+    return counts
+
+if __name__ == "__main__":
+    # python -m src.utils.parquet_store export|import [dataset ...]
+    action = sys.argv[1] if len(sys.argv) > 1 else "export"
+    names = sys.argv[2:] or None
+    print(export_parquet(names) if action == "export" else import_parquet(names))
@@ -0,0 +1,114 @@
+import sys
+import hashlib
+from typing import Any, Dict, List, Optional
+from src.utils.duckdb_helpers import get_con, quote_ident, relation_type, run_write
+
+# Long (Date, Ticker, ...) tables whose writers keep digests up to date
+DIGEST_TABLES = ["features_tidy", "raw_bars", "cleaned_bars"]
+KEY_COLUMNS = ("Date", "Ticker")
+
+DIGESTS_DDL = """
+CREATE TABLE IF NOT EXISTS dataset_digests (
+    dataset VARCHAR,
+    Ticker VARCHAR,
+    month DATE,
+    column_name VARCHAR,
+    digest UBIGINT,
+    row_count BIGINT,
+    last_date TIMESTAMP
+);
+"""
+
+def value_columns(con, table: str) -> List[str]:
+    return [d[0] for d in con.execute(f"SELECT * FROM {table} LIMIT 0").description if d[0] not in KEY_COLUMNS]
+
+def partition_filter(tickers: Optional[List[str]], start: Optional[Any], ticker_col: str, month_expr: str):
+    where, params = [], []
+    if tickers:
+        where.append(f"CAST({ticker_col} AS VARCHAR) IN ({', '.join('?' for _ in tickers)})")
+        params += [str(t) for t in tickers]
+    if start is not None:
+        where.append(f"{month_expr} >= date_trunc('month', CAST(? AS DATE))")
+        params.append(str(start)[:10])
+    return where, params
+
+def update_digests(con, table: str, tickers: Optional[List[str]] = None, start: Optional[Any] = None) -> None:
+    # XOR of hash(Date, value) per partition, so row order does not matter
+    con.execute(DIGESTS_DDL)
+    exists = relation_type(con, table) is not None
+    columns = value_columns(con, table) if exists else []
+    scope, scope_params = partition_filter(tickers, start, "Ticker", "month")
+    source_where, source_params = partition_filter(tickers, start, "Ticker", "date_trunc('month', Date)")
+    con.execute(
+        "DELETE FROM dataset_digests WHERE " + " AND ".join(["dataset = ?"] + scope), [table] + scope_params
+    )
+    if columns:
+        cols = ", ".join(quote_ident(c) for c in columns)
+        where = (" WHERE " + " AND ".join(source_where)) if source_where else ""
+        con.execute(
+            f"INSERT INTO dataset_digests "
+            f"SELECT ?, Ticker, month, column_name, bit_xor(hash(Date, value)), count(*), max(Date) FROM ("
+            f"  UNPIVOT (SELECT Date, CAST(Ticker AS VARCHAR) AS Ticker, "
+            f"           CAST(date_trunc('month', Date) AS DATE) AS month, {cols} FROM {table}{where}) "
+            f"  ON {cols} INTO NAME column_name VALUE value"
+            f") GROUP BY Ticker, month, column_name",
+            [table] + source_params,
+        )
+
+def update_frame_digests(con, table: str, frame=None) -> None:
+    # Write hook: the partitions of `frame` (a whole rewrite when None)
+    if table not in DIGEST_TABLES:
+        return
+    if frame is None or frame.empty or "Ticker" not in frame.columns or "Date" not in frame.columns:
+        update_digests(con, table)
+    else:
+        update_digests(con, table, sorted(frame["Ticker"].astype(str).unique()), frame["Date"].min())
+
+def refresh_digests(table: str, tickers: Optional[List[str]] = None, start: Optional[Any] = None) -> None:
+    # Standalone rebuild, for tables written before digests existed
+    def refresh(con):
+        con.execute("BEGIN TRANSACTION")
+        update_digests(con, table, tickers, start)
+        con.execute("COMMIT")
+    run_write(refresh)
+
+def has_digests(table: str) -> bool:
+    with get_con() as con:
+        if relation_type(con, "dataset_digests") is None:
+            return False
+        return con.execute("SELECT count(*) FROM dataset_digests WHERE dataset = ?", [table]).fetchone()[0] > 0
+
+def dataset_hash(table: str, tickers: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    # row_count takes the most complete column per partition
+    if not has_digests(table):
+        refresh_digests(table)
+    where, params = ["dataset = ?"], [table]
+    if tickers:
+        where.append(f"Ticker IN ({', '.join('?' for _ in tickers)})")
+        params += [str(t) for t in tickers]
+    if columns:
+        where.append(f"column_name IN ({', '.join('?' for _ in columns)})")
+        params += list(columns)
+    condition = " AND ".join(where)
+    with get_con() as con:
+        rows = con.execute(
+            f"SELECT Ticker, bit_xor(hash(month, column_name, digest)), max(last_date) FROM dataset_digests "
+            f"WHERE {condition} GROUP BY Ticker ORDER BY Ticker",
+            params,
+        ).fetchall()
+        row_count = con.execute(
+            f"SELECT sum(n) FROM (SELECT max(row_count) AS n FROM dataset_digests WHERE {condition} GROUP BY Ticker, month)",
+            params,
+        ).fetchone()[0]
+    if not rows:
+        return {"hash": None, "row_count": 0, "last_date": None}
+    root = hashlib.sha256()
+    for ticker, digest, _ in rows:
+        root.update(f"{ticker}:{digest:016x}\n".encode())
+    return {"hash": root.hexdigest(), "row_count": int(row_count), "last_date": str(max(r[2] for r in rows))}
+
+if __name__ == "__main__":
+    # python -m src.utils.partition_digests [table ...]; rebuilds all digests
+    for name in sys.argv[1:] or DIGEST_TABLES:
+        refresh_digests(name)
+        print(f"[INFO] {name}: {dataset_hash(name)}")
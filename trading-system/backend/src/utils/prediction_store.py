@@ -0,0 +1,125 @@
+import os
+import pandas as pd
+from typing import Any, List, Optional, Set
+from src.utils import duckdb_helpers
+from src.utils.duckdb_helpers import get_con, parquet_source, read_frame, relation_type, run_write
+
+# Columns callers see; model_key is internal
+PREDICTION_COLUMNS = ["model_id", "Date", "Ticker", "Prediction", "Return_1d"]
+
+PREDICTIONS_DDL = """
+CREATE TABLE IF NOT EXISTS predictions (
+    model_key INTEGER,
+    model_id VARCHAR,
+    Date DATE,
+    Ticker VARCHAR,
+    Prediction DOUBLE,
+    Return_1d DOUBLE
+);
+"""
+
+# One row per model: its key and the extent of its predictions
+MODELS_DDL = """
+CREATE TABLE IF NOT EXISTS prediction_models (
+    model_key INTEGER,
+    model_id VARCHAR,
+    row_count BIGINT,
+    start_date DATE,
+    end_date DATE,
+    updated_at TIMESTAMP
+);
+"""
+
+def cluster_predictions(con) -> None:
+    # Also converts legacy tables (VARCHAR dates, no model_key)
+    con.execute("BEGIN TRANSACTION")
+    con.execute(
+        "CREATE OR REPLACE TABLE predictions AS "
+        "SELECT CAST(dense_rank() OVER (ORDER BY model_id) AS INTEGER) AS model_key, model_id, "
+        "CAST(CAST(Date AS TIMESTAMP) AS DATE) AS Date, CAST(Ticker AS VARCHAR) AS Ticker, "
+        "CAST(Prediction AS DOUBLE) AS Prediction, CAST(Return_1d AS DOUBLE) AS Return_1d "
+        "FROM predictions ORDER BY model_key, Date, Ticker"
+    )
+    con.execute("DROP TABLE IF EXISTS prediction_models")
+    con.execute(MODELS_DDL)
+    con.execute(
+        "INSERT INTO prediction_models "
+        "SELECT model_key, any_value(model_id), count(*), min(Date), max(Date), now() "
+        "FROM predictions GROUP BY model_key ORDER BY model_key"
+    )
+    con.execute("COMMIT")
+
+# Databases whose predictions schema was checked by this process
+_ensured: Set[str] = set()
+
+def ensure_predictions_table() -> None:
+    # Once per process and database: later calls never reach the writer queue
+    path = os.path.abspath(duckdb_helpers.DB_PATH)
+    if path in _ensured:
+        return
+
+    def ensure(con):
+        exists = relation_type(con, "predictions") is not None
+        legacy = exists and "model_key" not in [d[0] for d in con.execute("SELECT * FROM predictions LIMIT 0").description]
+        indexed = relation_type(con, "prediction_models") is not None
+        con.execute(PREDICTIONS_DDL)
+        if legacy or (exists and not indexed):
+            cluster_predictions(con)
+            print("[INFO] Rebuilt 'predictions' clustered by (model_key, Date, Ticker)")
+        con.execute(MODELS_DDL)
+    run_write(ensure)
+    _ensured.add(path)
+
+def model_key(model_id: str) -> Optional[int]:
+    with get_con() as con:
+        row = con.execute("SELECT model_key FROM prediction_models WHERE model_id = ?", [model_id]).fetchone()
+    return row[0] if row else None
+
+def replace_predictions(model_id: str, df: pd.DataFrame) -> int:
+    # A fresh key (max + 1) keeps each model contiguous, so zone maps skip the others
+    ensure_predictions_table()
+    frame = df.assign(model_id=model_id)[PREDICTION_COLUMNS]
+
+    def replace(con):
+        con.register("predictions_frame", frame)
+        try:
+            con.execute("BEGIN TRANSACTION")
+            key = con.execute("SELECT coalesce(max(model_key), 0) + 1 FROM prediction_models").fetchone()[0]
+            con.execute("DELETE FROM predictions WHERE model_key IN (SELECT model_key FROM prediction_models WHERE model_id = ?)", [model_id])
+            con.execute("DELETE FROM prediction_models WHERE model_id = ?", [model_id])
+            con.execute(
+                "INSERT INTO predictions SELECT ?, model_id, CAST(Date AS DATE), Ticker, Prediction, Return_1d "
+                "FROM predictions_frame ORDER BY Date, Ticker",
+                [key],
+            )
+            con.execute(
+                "INSERT INTO prediction_models "
+                "SELECT ?, ?, count(*), min(Date), max(Date), now() FROM predictions WHERE model_key = ?",
+                [key, model_id, key],
+            )
+            con.execute("COMMIT")
+        finally:
+            con.unregister("predictions_frame")
+    run_write(replace)
+    return len(frame)
+
+def read_predictions(
+    model_id: str,
+    tickers: Optional[List[str]] = None,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+) -> pd.DataFrame:
+    filters = {"model_id": model_id}
+    if parquet_source("predictions") is None:
+        ensure_predictions_table()
+        # model_id strings share long prefixes, which string zone maps can't tell apart
+        key = model_key(model_id)
+        if key is None:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        filters["model_key"] = key
+    return read_frame("predictions", columns=PREDICTION_COLUMNS, tickers=tickers, start=start, end=end, filters=filters)
+
+if __name__ == "__main__":
+    ensure_predictions_table()
+    run_write(cluster_predictions)
+    print("[INFO] Clustered 'predictions'")
@@ -0,0 +1,88 @@
+import datetime
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMemorialDay, USPresidentsDay,
+    MO, USThanksgivingDay, nearest_workday, sunday_to_monday,
+)
+from pandas.tseries.offsets import DateOffset
+
+# Range the holiday list is materialized over
+CALENDAR_START = "1990-01-01"
+CALENDAR_END = "2100-12-31"
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        Holiday("Martin Luther King Jr. Day", month=1, day=1, start_date="1998-01-01", offset=DateOffset(weekday=MO(3))),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+# Unscheduled full-day closures
+NYSE_CLOSURES = [
+    "1994-04-27", "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14", "2004-06-11",
+    "2007-01-02", "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09",
+]
+
+class TradingCalendar:
+    """
+    Weekday sessions minus an exchange's holidays and closures. `sessions`
+    returns session dates (midnight timestamps) in [start, end].
+    """
+    def __init__(
+        self,
+        name: str,
+        holiday_calendar: AbstractHolidayCalendar,
+        closures: List[str],
+        tz: str = "America/New_York",
+        close: str = "16:00",
+    ):
+        self.name = name
+        self.tz = tz
+        self.close = datetime.time.fromisoformat(close)
+        holidays = holiday_calendar.holidays(CALENDAR_START, CALENDAR_END)
+        self.holidays = holidays.union(pd.DatetimeIndex(closures)).sort_values()
+        self.offset = pd.offsets.CustomBusinessDay(holidays=self.holidays)
+
+    def sessions(self, start: Any, end: Any) -> pd.DatetimeIndex:
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        if end < start:
+            return pd.DatetimeIndex([])
+        return pd.date_range(start, end, freq=self.offset)
+
+    def is_session(self, date: Any) -> bool:
+        return self.offset.is_on_offset(pd.Timestamp(date).normalize())
+
+    def next_session(self, date: Any) -> pd.Timestamp:
+        # First session strictly after `date`
+        return pd.Timestamp(date).normalize() + self.offset
+
+    def previous_session(self, date: Any) -> pd.Timestamp:
+        # Last session strictly before `date`
+        return pd.Timestamp(date).normalize() - self.offset
+
+    def last_completed_session(self, now: Optional[Any] = None) -> pd.Timestamp:
+        # Today's session counts only once the exchange has closed
+        now = pd.Timestamp.now(tz=self.tz) if now is None else pd.Timestamp(now)
+        now = now.tz_localize(self.tz) if now.tzinfo is None else now.tz_convert(self.tz)
+        today = now.tz_localize(None).normalize()
+        if self.is_session(today) and now.time() >= self.close:
+            return today
+        return self.previous_session(today)
+
+_calendars: Dict[str, TradingCalendar] = {}
+
+def get_calendar(name: str = "XNYS") -> TradingCalendar:
+    if name not in _calendars:
+        if name != "XNYS":
+            raise KeyError(f"Unknown trading calendar '{name}'")
+        _calendars[name] = TradingCalendar(name, NYSEHolidayCalendar(), NYSE_CLOSURES)
+    return _calendars[name]
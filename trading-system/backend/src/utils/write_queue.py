@@ -0,0 +1,141 @@
+import time
+import queue
+import threading
+import pandas as pd
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+# Jobs drained per batch, and how long the writer waits for more to arrive
+WRITE_BATCH = 256
+WRITE_LINGER_SECONDS = 0.005
+
+class WriteJob:
+    def __init__(self, fn: Optional[Callable] = None, table: Optional[str] = None, frame: Optional[pd.DataFrame] = None):
+        self.fn = fn
+        self.table = table
+        self.frame = frame
+        self.future: Future = Future()
+
+class WriteQueue:
+    """
+    A single background thread that performs every database write, in
+    submission order. Consecutive inserts into the same table are merged
+    into one INSERT inside one transaction; other jobs run one at a time.
+    Callers get a Future per job.
+    """
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_batch: int = WRITE_BATCH,
+        linger: float = WRITE_LINGER_SECONDS,
+        on_insert: Optional[Callable[[Any, str, pd.DataFrame], None]] = None,
+    ):
+        self.connect = connect
+        # on_insert(con, table, frame) runs inside each insert's transaction
+        self.on_insert = on_insert
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue: "queue.Queue[Optional[WriteJob]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="duckdb-writer", daemon=True)
+                self._thread.start()
+
+    def in_writer(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        # `fn(con)` runs on the writer thread; it may manage its own transaction
+        return self._put(WriteJob(fn=fn))
+
+    def insert(self, table: str, frame: pd.DataFrame) -> Future:
+        return self._put(WriteJob(table=table, frame=frame))
+
+    def _put(self, job: WriteJob) -> Future:
+        self.start()
+        self._queue.put(job)
+        return job.future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        # Pending jobs are written before the thread exits
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _take_batch(self) -> List[Optional[WriteJob]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            stop = batch[-1] is None
+            jobs = [job for job in batch if job is not None]
+            try:
+                with self.connect() as con:
+                    pending: List[WriteJob] = []
+                    for job in jobs:
+                        if job.fn is None and (not pending or pending[0].table == job.table):
+                            pending.append(job)
+                            continue
+                        self._flush_inserts(con, pending)
+                        pending = [job] if job.fn is None else []
+                        if job.fn is not None:
+                            self._run_job(con, job)
+                    self._flush_inserts(con, pending)
+            except BaseException as e:
+                # e.g. the database could not be opened; never leave a caller waiting
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            if stop:
+                return
+
+    @staticmethod
+    def _run_job(con, job: WriteJob) -> None:
+        try:
+            job.future.set_result(job.fn(con))
+        except BaseException as e:
+            # Don't leave a failed job's transaction open for the next job on this cursor
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+            job.future.set_exception(e)
+
+    def _flush_inserts(self, con, jobs: List[WriteJob]) -> None:
+        if not jobs:
+            return
+        table = jobs[0].table
+        frame = jobs[0].frame if len(jobs) == 1 else pd.concat([job.frame for job in jobs], ignore_index=True)
+        try:
+            con.execute("BEGIN TRANSACTION")
+            con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM frame")
+            if self.on_insert is not None:
+                self.on_insert(con, table, frame)
+            con.execute("COMMIT")
+        except Exception as e:
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+            if len(jobs) == 1:
+                jobs[0].future.set_exception(e)
+                return
+            # Retry one by one so only the offending caller sees the error
+            for job in jobs:
+                self._flush_inserts(con, [job])
+            return
+        for job in jobs:
+            job.future.set_result(len(job.frame))
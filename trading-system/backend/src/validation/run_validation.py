@@ -1,4 +1,5 @@
-from src.utils.duckdb_helpers import read_table, write_table
+from src.utils.duckdb_helpers import read_table
+from src.utils.bar_storage import write_bars
 from validate_data import run_full_validation, basic_cleaning
 
 REQUIRED_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
@@ -10,7 +11,7 @@ try:
     results = run_full_validation(df, REQUIRED_COLUMNS, OUTLIER_COLUMNS)
     print(f"Validation results for DuckDB raw: {results}")
     cleaned = basic_cleaning(df)
-    write_table(cleaned, "cleaned")  # this saves all tickers at once
+    write_bars("cleaned", cleaned)  # this saves all tickers at once
     print("Cleaned data written to DuckDB 'cleaned' table")
 except Exception as e:
     print(f"Validation failed: {e}")
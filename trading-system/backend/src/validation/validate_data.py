@@ -1,13 +1,12 @@
 import pandas as pd
 from typing import List, Dict, Any
-from src.utils.pandas_helpers import flatten_columns
+from src.utils.pandas_helpers import flatten_columns, split_wide_column
+from src.utils.bar_storage import BAR_FIELDS, ensure_bars_table
+from src.utils.duckdb_helpers import get_con, quote_ident, relation_type
 
 def get_tickers_from_columns(df: pd.DataFrame) -> List[str]:
-    tickers = set()
-    for col in df.columns:
-        if "_" in col:
-            tickers.add(col.split("_")[0])
-    return sorted(tickers)
+    parsed = (split_wide_column(col) for col in df.columns)
+    return sorted(set(p[0] for p in parsed if p is not None))
 
 def required_columns_for_tickers(tickers: List[str], base_cols: List[str]) -> List[str]:
     return [f"{ticker}_{col}" for ticker in tickers for col in base_cols]
@@ -64,3 +63,79 @@ def run_full_validation(
     results["duplicate_rows"] = detect_duplicates(df)
     results["outliers"] = detect_outliers(df, outlier_columns)
     return results
+
+# Bar checks run by the SQL engine: name -> condition counted per ticker
+Z_THRESH = 5.0
+BAR_CHECKS = {
+    "high_below_low": '"High" < "Low"',
+    "high_below_open_close": '"High" < greatest("Open", "Close")',
+    "low_above_open_close": '"Low" > least("Open", "Close")',
+    "non_positive_price": 'least("Open", "High", "Low", "Close") <= 0',
+    "non_positive_volume": '"Volume" <= 0',
+}
+
+def compile_validation_query(table: str, fields: List[str]) -> str:
+    # Per-ticker moments in one CTE, every count in one GROUP BY over the join
+    stats = ", ".join(
+        f"avg({quote_ident(f)}) AS {quote_ident('mean_' + f)}, stddev_pop({quote_ident(f)}) AS {quote_ident('std_' + f)}"
+        for f in fields
+    )
+    counts = []
+    for f in fields:
+        col, mean, std = quote_ident(f), quote_ident("mean_" + f), quote_ident("std_" + f)
+        counts.append(f"count(*) FILTER (WHERE {col} IS NULL) AS {quote_ident('null_' + f)}")
+        counts.append(f"count(*) FILTER (WHERE abs({col} - s.{mean}) > $z * s.{std}) AS {quote_ident('outlier_' + f)}")
+    counts += [f"count(*) FILTER (WHERE {cond}) AS {quote_ident(name)}" for name, cond in BAR_CHECKS.items()]
+    return (
+        f"WITH stats AS (SELECT Ticker, {stats} FROM {table} GROUP BY Ticker) "
+        f"SELECT t.Ticker, count(*) AS row_count, count(*) - count(DISTINCT t.Date) AS duplicate_keys, "
+        f"min(t.Date) AS first_date, max(t.Date) AS last_date, {', '.join(counts)} "
+        f"FROM {table} t JOIN stats s ON s.Ticker IS NOT DISTINCT FROM t.Ticker "
+        f"GROUP BY t.Ticker ORDER BY t.Ticker"
+    )
+
+def validate_table(table: str, fields: List[str] = None, z_thresh: float = Z_THRESH) -> Dict[str, Any]:
+    """
+    Profile a long (Date, Ticker, fields...) bar table in one DuckDB query:
+    nulls, duplicate (Date, Ticker) keys, z-score outliers (population std
+    per ticker, as detect_outliers) and the OHLC / volume checks. Only one
+    row per ticker comes back; counts are keyed "{ticker}_{field}" like the
+    wide report and zero counts are left out.
+    """
+    fields = fields or BAR_FIELDS
+    with get_con() as con:
+        if relation_type(con, table) is None:
+            raise ValueError(f"Table '{table}' does not exist")
+        present = [d[0] for d in con.execute(f"SELECT * FROM {table} LIMIT 0").description]
+        missing = [c for c in dict.fromkeys(["Date", "Ticker"] + BAR_FIELDS + list(fields)) if c not in present]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        cursor = con.execute(compile_validation_query(table, fields), {"z": z_thresh})
+        names = [d[0] for d in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+    report: Dict[str, Any] = {
+        "table": table,
+        "row_count": sum(r["row_count"] for r in rows),
+        "tickers": len(rows),
+        "start_date": str(min(r["first_date"] for r in rows)) if rows else None,
+        "end_date": str(max(r["last_date"] for r in rows)) if rows else None,
+        "missing_data": {},
+        "duplicate_rows": sum(r["duplicate_keys"] for r in rows),
+        "duplicate_keys": {r["Ticker"]: r["duplicate_keys"] for r in rows if r["duplicate_keys"]},
+        "outliers": {},
+        "checks": {name: {} for name in BAR_CHECKS},
+    }
+    for r in rows:
+        for f in fields:
+            if r["null_" + f]:
+                report["missing_data"][f"{r['Ticker']}_{f}"] = r["null_" + f]
+            if r["outlier_" + f]:
+                report["outliers"][f"{r['Ticker']}_{f}"] = r["outlier_" + f]
+        for name in BAR_CHECKS:
+            if r[name]:
+                report["checks"][name][r["Ticker"]] = r[name]
+    report["passed"] = not report["duplicate_rows"] and not any(report["checks"].values())
+    return report
+
+def validate_bars(name: str = "raw", z_thresh: float = Z_THRESH) -> Dict[str, Any]:
+    return validate_table(ensure_bars_table(name), z_thresh=z_thresh)